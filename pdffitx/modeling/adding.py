@@ -1,11 +1,17 @@
 """Add variables to recipe."""
 import typing as tp
+from collections import defaultdict
 
 from diffpy.srfit.pdf import PDFGenerator, DebyePDFGenerator
+from diffpy.srfit.structure.diffpyparset import DiffpyStructureParSet
+from diffpy.srfit.structure.objcrystparset import ObjCrystCrystalParSet
 
 from pdffitx.modeling.core import MyRecipe, MyContribution
 
 G = tp.Union[PDFGenerator, DebyePDFGenerator]
+P = tp.Union[ObjCrystCrystalParSet, DiffpyStructureParSet]
+
+_DELTA_ATTR = {"1": "delta1", "2": "delta2"}
 
 
 def initialize(
@@ -107,13 +113,7 @@ def add_params(recipe: MyRecipe, con: MyContribution, params: tp.Union[None, str
     """Add contribution-level parameters in the contribution."""
     if not params:
         return
-    args = {
-        arg.name: arg
-        for eq in con.eqfactory.equations
-        if eq.name == "eq"
-        for arg in eq.args
-        if arg.name != con.xname
-    }
+    args = con.eqargs
     if params == "a":
         pars = args.values()
     else:
@@ -156,11 +156,12 @@ def add_scale(recipe: MyRecipe, gen: G, scale: bool = True) -> None:
     """Add the scale of the generator."""
     if not scale:
         return
+    name = gen.name + "_scale"
     recipe.addVar(
         gen.scale,
         value=0.,
-        name="{}_scale".format(gen.name),
-        tags=["{}_scale".format(gen.name), "scale", gen.name]
+        name=name,
+        tags=[name, "scale", gen.name]
     ).boundRange(
         lb=0.
     )
@@ -171,17 +172,15 @@ def add_delta(recipe: MyRecipe, gen: G, delta: tp.Union[str, None]) -> None:
     """Add the delta parameter of the generator."""
     if not delta:
         return
-    if delta == "1":
-        par = gen.delta1
-    elif delta == "2":
-        par = gen.delta2
-    else:
+    if delta not in _DELTA_ATTR:
         raise ValueError("Unknown delta: {}. Allowed: delta1, delta2.".format(delta))
+    par = getattr(gen, _DELTA_ATTR[delta])
+    prefix = gen.name + "_"
     recipe.addVar(
         par,
         value=0.,
-        name="{}_{}".format(gen.name, par.name),
-        tags=["{}_delta".format(gen.name), "delta", gen.name]
+        name=prefix + par.name,
+        tags=[prefix + "delta", "delta", gen.name]
     ).boundRange(
         lb=0.
     )
@@ -192,28 +191,26 @@ def add_lat(recipe: MyRecipe, gen: G, lat: tp.Union[str, None]) -> None:
     """Add the lattice parameters of the phase."""
     if not lat:
         return
-    tags = ["lat", gen.name, "{}_lat".format(gen.name)]
+    prefix = gen.name + "_"
+    tags = ["lat", gen.name, prefix + "lat"]
     if lat == "e":
         v = recipe.newVar(
-            "{}_zoom".format(gen.name),
+            prefix + "zoom",
             tags=tags,
             value=1
         ).boundRange(
             lb=0.
         )
         for par in gen.phase.getLattice():
-            recipe.constrain(par, "{} * {}".format(par.value, v.name))
+            recipe.constrain(par, f"{par.value} * {v.name}")
         return
-    if lat == "s":
-        pars = gen.phase.sgpars.latpars
-    elif lat == "a":
-        pars = gen.phase.getLattice()
-    else:
+    if lat not in _LAT_PARS:
         raise ValueError("Unknown lat: {}. Allowed: sg, all.".format(lat))
+    pars = _LAT_PARS[lat](gen.phase)
     for par in pars:
         recipe.addVar(
             par,
-            name="{}_{}".format(gen.name, par.name),
+            name=prefix + par.name,
             tags=tags
         ).boundRange(
             lb=0.
@@ -221,6 +218,22 @@ def add_lat(recipe: MyRecipe, gen: G, lat: tp.Union[str, None]) -> None:
     return
 
 
+def _sg_lat_pars(phase: P) -> list:
+    """Get the space group constrained lattice parameters."""
+    return phase.sgpars.latpars
+
+
+def _all_lat_pars(phase: P) -> list:
+    """Get all the lattice parameters."""
+    return phase.getLattice()
+
+
+_LAT_PARS = {
+    "s": _sg_lat_pars,
+    "a": _all_lat_pars
+}
+
+
 def add_adp(
     recipe: MyRecipe, gen: G, adp: tp.Union[str, None],
     symbols: tp.Tuple[str] = ("Biso", "B11", "B22", "B33")
@@ -228,70 +241,107 @@ def add_adp(
     """Add the atomic displacement parameter of the phase."""
     if not adp:
         return
-    atoms = gen.phase.getScatterers()
+    prefix = gen.name + "_"
+    tags = ["adp", gen.name, prefix + "adp"]
     if adp == "e":
-        elements = set((atom.element for atom in atoms))
-        dct = dict()
-        for element in elements:
-            dct[element] = recipe.newVar(
-                "{}_{}_Biso".format(gen.name, bleach(element)),
+        bisos = defaultdict(list)
+        for atom in gen.phase.getScatterers():
+            bisos[atom.element].append(atom.Biso)
+        for element, pars in bisos.items():
+            v = recipe.newVar(
+                f"{prefix}{bleach(element)}_Biso",
                 value=0.05,
-                tags=["adp", gen.name, "{}_adp".format(gen.name)]
+                tags=tags
             )
-        for atom in atoms:
-            recipe.constrain(atom.Biso, dct[atom.element])
+            for par in pars:
+                recipe.constrain(par, v)
         return
-    if adp == "a":
-        pars = [atom.Biso for atom in atoms]
-        names = ["{}_Biso".format(bleach(atom.name)) for atom in atoms]
-    elif adp == "s":
-        pars = gen.phase.sgpars.adppars
-        names = [
-            rename_by_atom(par.name, atoms) for par in pars
-            if par.name.split("_")[0] in symbols
-        ]
-    else:
+    if adp not in _ADP_PARS:
         raise ValueError("Unknown adp: {}. Allowed: element, sg, all.".format(adp))
+    pars, names = _ADP_PARS[adp](gen.phase)
     for par, name in zip(pars, names):
+        # the pars and names are filtered together so that they stay paired
+        if par.name.split("_")[0] not in symbols:
+            continue
         recipe.addVar(
             par,
-            name="{}_{}".format(gen.name, name),
+            name=prefix + name,
             value=par.value if par.value != 0. else 0.05,
-            tags=["adp", gen.name, "{}_adp".format(gen.name)]
+            tags=tags
         ).boundRange(
             lb=0.
         )
     return
 
 
+def _all_adp_pars(phase: P) -> tp.Tuple[list, list]:
+    """Get all the Biso of the atoms and their names."""
+    atoms = phase.getScatterers()
+    pars = [atom.Biso for atom in atoms]
+    names = [bleach(atom.name) + "_Biso" for atom in atoms]
+    return pars, names
+
+
+def _sg_adp_pars(phase: P) -> tp.Tuple[list, list]:
+    """Get the space group constrained ADPs and their names."""
+    atoms = phase.getScatterers()
+    pars = phase.sgpars.adppars
+    names = [rename_by_atom(par.name, atoms) for par in pars]
+    return pars, names
+
+
+_ADP_PARS = {
+    "a": _all_adp_pars,
+    "s": _sg_adp_pars
+}
+
+
 def add_xyz(recipe: MyRecipe, gen: G, xyz: tp.Union[str, None]) -> None:
     """Add the coordinates of the atoms in the phase."""
     if not xyz:
         return
-    atoms = gen.phase.getScatterers()
-    if xyz == "s":
-        pars = gen.phase.sgpars.xyzpars
-        names = [rename_by_atom(par.name, atoms) for par in pars]
-    elif xyz == "a":
-        pars, names = list(), list()
-        for atom in atoms:
-            pars.append(atom.x)
-            names.append("{}_x".format(atom.name))
-            pars.append(atom.y)
-            names.append("{}_y".format(atom.name))
-            pars.append(atom.z)
-            names.append("{}_z".format(atom.name))
-    else:
+    if xyz not in _XYZ_PARS:
         raise ValueError("Unknown xyz: {}. Allowed: s, a.".format(xyz))
+    pars, names = _XYZ_PARS[xyz](gen.phase)
+    prefix = gen.name + "_"
+    tags = ["xyz", gen.name, prefix + "xyz"]
     for par, name in zip(pars, names):
         recipe.addVar(
             par,
-            name="{}_{}".format(gen.name, name),
-            tags=["xyz", gen.name, "{}_xyz".format(gen.name)]
+            name=prefix + name,
+            tags=tags
         )
     return
 
 
+def _sg_xyz_pars(phase: P) -> tp.Tuple[list, list]:
+    """Get the space group constrained coordinates and their names."""
+    atoms = phase.getScatterers()
+    pars = phase.sgpars.xyzpars
+    names = [rename_by_atom(par.name, atoms) for par in pars]
+    return pars, names
+
+
+def _all_xyz_pars(phase: P) -> tp.Tuple[list, list]:
+    """Get all the coordinates of the atoms and their names."""
+    pars, names = list(), list()
+    for atom in phase.getScatterers():
+        prefix = atom.name + "_"
+        pars.append(atom.x)
+        names.append(prefix + "x")
+        pars.append(atom.y)
+        names.append(prefix + "y")
+        pars.append(atom.z)
+        names.append(prefix + "z")
+    return pars, names
+
+
+_XYZ_PARS = {
+    "s": _sg_xyz_pars,
+    "a": _all_xyz_pars
+}
+
+
 def rename_by_atom(name: str, atoms: list) -> str:
     """Rename of the name of a parameter by replacing the index of the atom in the name by the label of
     the atom and revert the order of coordinates and atom name.
@@ -1,15 +1,41 @@
 """Core of the PDFfitx."""
-from typing import Dict, Union
+from collections import Counter
+from typing import Dict, Optional, Union
 
+import numpy as np
 from diffpy.srfit.equation.builder import EquationFactory
 from diffpy.srfit.fitbase import FitRecipe, FitContribution
 from diffpy.srfit.fitbase import FitResults
+from diffpy.srfit.fitbase.parameter import Parameter
 from diffpy.srfit.pdf import PDFGenerator, DebyePDFGenerator
+from numba import njit
+
+
+@njit(cache=True)
+def _residual_kernel(ycalc, y, scale, weight, out):
+    """Fill the out with weight * scale * (ycalc - y) in a single pass."""
+    for i in range(y.shape[0]):
+        out[i] = weight * scale[i] * (ycalc[i] - y[i])
+    return out
+
+
+def _warm_up_kernel() -> None:
+    """Compile the kernel for a broadcast scalar scale and an array scale, which have different layouts."""
+    x = np.zeros(2)
+    for scale in (1., np.ones(2)):
+        _residual_kernel(x, x, np.broadcast_to(scale, x.shape), 1., np.empty(2))
+
+
+# the kernel is compiled at the import so that the first residual doesn't pay for it
+_warm_up_kernel()
 
 
 class MyContribution(FitContribution):
     """The FitContribution with augmented features."""
 
+    _reseqstr = None
+    _cf_arg_cache = None
+
     @property
     def generators(self) -> Dict[str, Union[PDFGenerator, DebyePDFGenerator]]:
         return self._generators
@@ -25,15 +51,236 @@ class MyContribution(FitContribution):
     @xname.setter
     def xname(self, value: str):
         self._xname = value
+        self._cf_arg_cache = None
+
+    @property
+    def eqargs(self) -> Dict[str, Parameter]:
+        """The mapping from the name to the argument in the equation except the independent variable."""
+        if self._cf_arg_cache is None:
+            self._cf_arg_cache = {
+                arg.name: arg
+                for eq in self._eqfactory.equations
+                if eq.name == "eq"
+                for arg in eq.args
+                if arg.name != self._xname
+            }
+        return self._cf_arg_cache
+
+    def setEquation(self, eqstr, ns={}):
+        """Set the profile equation for the FitContribution and reset the cache of its arguments."""
+        super().setEquation(eqstr, ns)
+        self._cf_arg_cache = None
+
+    def setResidualEquation(self, eqstr):
+        """Set the residual equation for the FitContribution and remember the string of it."""
+        super().setResidualEquation(eqstr)
+        self._reseqstr = eqstr
+
+    def residual_scale(self) -> Union[np.ndarray, float, None]:
+        """Get the factor s in the residual = s * (eq - y).
+
+        If the residual is not one of the presets, return None.
+        """
+        if self._reseqstr == "chiv":
+            return 1. / self.profile.dy
+        if self._reseqstr == "resv":
+            return 1. / np.sqrt(np.sum(self.profile.y ** 2))
+        return None
 
 
 class MyRecipe(FitRecipe):
     """The FitRecipe interface with augmented features."""
 
+    _results_cache = None
+    _residual_cache = None
+    _version = 0
+
     @property
     def contributions(self) -> Dict[str, MyContribution]:
         return self._contributions
 
+    def _flush(self, other):
+        """Count the change of a parameter or a profile in the recipe and notify the observers."""
+        self._version += 1
+        super()._flush(other)
+
+    def _updateConfiguration(self):
+        """Count the change of the constraints, the restraints or the variables in the recipe."""
+        self._version += 1
+        super()._updateConfiguration()
+
+    def setWeight(self, con, weight):
+        """Set the weight of a FitContribution."""
+        super().setWeight(con, weight)
+        self._version += 1
+
+    def getResults(self) -> FitResults:
+        """Get the FitResults of the recipe.
+
+        The results are cached and reused until the recipe is changed. A change is anything that srfit notifies
+        the recipe of, like a new value of a parameter or new data in a profile, a change of the constraints,
+        the restraints or the variables, a new weight or a variable that is fixed or freed. The edits of
+        the structure that don't go through a parameter are not seen, just like in srfit. The results should
+        not be modified.
+
+        Returns
+        -------
+        results
+            The results of the current state of the recipe.
+        """
+        if self._results_cache is None or self._results_cache[0] != self._results_key():
+            results = FitResults(self)
+            # the numerical derivatives in the results change the values and bump the version
+            self._results_cache = (self._results_key(), results)
+        return self._results_cache[1]
+
+    def _results_key(self) -> tuple:
+        """Get the key that changes if the FitResults of the recipe changes."""
+        # fixing or freeing a variable only tags it, so it is not counted in the version
+        return self._version, tuple(self.isFree(par) for par in self._parameters.values())
+
+    def residual(self, p=[], out: np.ndarray = None) -> np.ndarray:
+        """Calculate the vector residual to be optimized.
+
+        It is the same as the `FitRecipe.residual` but the weighted residuals of the contributions and the
+        restraints are written into a single preallocated array instead of being concatenated.
+
+        Parameters
+        ----------
+        p
+            The list of current variable values, provided in the same order as the '_parameters' list. If p is
+            an empty iterable (default), the explicit update of the variables is skipped.
+
+        out
+            The array to write the residual in. If None or its size doesn't match, a new array is allocated.
+            The solver keeps the residual of the last step so it should get a new array in each call.
+
+        Returns
+        -------
+        chiv
+            The array such that dot(chiv, chiv) = chi^2 + restraints.
+        """
+        self._prepare()
+        for fithook in self.fithooks:
+            fithook.precall(self)
+        self._applyValues(p)
+        for con in self._oconstraints:
+            con.update()
+        # the preset residuals are calculated by the kernel, the others by the residual equation
+        terms = []
+        for weight, con in zip(self._weights, self._contributions.values()):
+            scale = con.residual_scale() if isinstance(con, MyContribution) else None
+            if scale is None:
+                terms.append((weight, con.residual().ravel(), None, None))
+            else:
+                con.profile.ycalc = ycalc = con._eq()
+                y = con.profile.y
+                terms.append((weight, y, ycalc, np.broadcast_to(scale, y.shape)))
+        n = sum(arr.size for _, arr, _, _ in terms)
+        m = n + len(self._restraintlist)
+        chiv = out if out is not None and out.shape == (m,) else np.empty(m)
+        start = 0
+        for weight, arr, ycalc, scale in terms:
+            stop = start + arr.size
+            if scale is None:
+                np.multiply(weight, arr, out=chiv[start:stop])
+            else:
+                _residual_kernel(ycalc, arr, scale, weight, chiv[start:stop])
+            start = stop
+        # the point-average chi^2 is used in the penalty of restraints
+        w = np.dot(chiv[:n], chiv[:n]) / n
+        for i, res in enumerate(self._restraintlist, start=n):
+            chiv[i] = np.sqrt(res.penalty(w))
+        for fithook in self.fithooks:
+            fithook.postcall(self, chiv)
+        # a copy is kept because the caller owns chiv
+        if self._residual_cache is None or self._residual_cache[1].shape != chiv.shape:
+            self._residual_cache = (self._version, chiv.copy())
+        else:
+            np.copyto(self._residual_cache[1], chiv)
+            self._residual_cache = (self._version, self._residual_cache[1])
+        return chiv
+
+    def _last_residual(self, p) -> Optional[np.ndarray]:
+        """Get the last residual if the recipe hasn't changed since then and p is the current values, else None.
+
+        The array is the cache of the recipe and should not be modified.
+        """
+        if self._residual_cache is None or self._residual_cache[0] != self._version:
+            return None
+        if len(p) and not np.array_equal(p, self.getValues()):
+            return None
+        return self._residual_cache[1]
+
+    def jacobian(self, p=[]) -> np.ndarray:
+        """Calculate the Jacobian of the vector residual with respect to the free variables.
+
+        The column of a variable is analytic if the variable is a parameter of a generator that provides the
+        `derivatives` method, the equation of contribution is only that generator and no other parameter is
+        constrained to the variable. Otherwise, the column is calculated by the forward difference. The residual
+        at p is reused if it is the last one evaluated and the recipe hasn't changed since then.
+
+        Parameters
+        ----------
+        p
+            The list of current variable values. See `residual`.
+
+        Returns
+        -------
+        jac
+            The two dimensional array. Each column is the derivative of the residual with respect to a variable.
+        """
+        # the solver has usually just evaluated the residual at p
+        r0 = self._last_residual(p)
+        if r0 is None:
+            r0 = self.residual(p)
+        x0 = self.getValues()
+        variables = [v for v in self._parameters.values() if self.isFree(v)]
+        jac = np.zeros((r0.shape[0], len(variables)))
+        columns = self._analytic_columns(variables) if not self._restraintlist else {}
+        numeric = False
+        buf = np.empty_like(r0)
+        for i, var in enumerate(variables):
+            if var in columns:
+                start, stop, col = columns[var]
+                jac[start:stop, i] = col
+                continue
+            numeric = True
+            h = np.sqrt(np.finfo(float).eps) * max(1., abs(x0[i]))
+            x = x0.copy()
+            x[i] += h
+            np.subtract(self.residual(x, out=buf), r0, out=jac[:, i])
+            jac[:, i] /= h
+        if numeric:
+            self.residual(x0)
+        return jac
+
+    def _analytic_columns(self, variables: list) -> dict:
+        """Map the variables to the (start row, stop row, column) of the analytic derivatives.
+
+        A variable gets an analytic column only if it is the proxy of a parameter of a generator that is the
+        whole equation of a single contribution and no other parameter is constrained to it.
+        """
+        # the variables driving the constrained parameters change more than their own parameter
+        drivers = {id(arg) for con in self._oconstraints for arg in con.eq.args}
+        owners = Counter(id(gen) for con in self._contributions.values() for gen in con._generators.values())
+        columns = dict()
+        start = 0
+        for weight, con in zip(self._weights, self._contributions.values()):
+            stop = start + con.profile.x.shape[0]
+            scale = con.residual_scale() if isinstance(con, MyContribution) else None
+            # the root of the equation tree is the generator itself if the equation is only the generator
+            root = con._eq.root
+            gen = next((g for g in con._generators.values() if g is root), None)
+            if scale is not None and hasattr(gen, "derivatives") and owners[id(gen)] == 1:
+                derivatives = gen.derivatives(con.profile.x)
+                for var in variables:
+                    par = getattr(var, "par", None)
+                    if par in derivatives and not par.constrained and not {id(var), id(par)} & drivers:
+                        columns[var] = (start, stop, weight * scale * derivatives[par])
+            start = stop
+        return columns
+
 
 class MyFitResults(FitResults):
     """The augmented fit result interface."""
@@ -30,7 +30,7 @@ def save_fgr(con: FitContribution, base_name: str, folder: str) -> Path:
     fgr_file : Path
         The path to the fgr file.
     """
-    fgr_file = Path(folder) / "{}.fgr".format(base_name)
+    fgr_file = Path(folder) / f"{base_name}.fgr"
     con.profile.savetxt(fgr_file, header="x ycalc y dy")
     return fgr_file
 
@@ -71,7 +71,7 @@ def save_stru(
     stru_file : Path
         The path to the saved files.
     """
-    stru_file = Path(folder) / "{}.{}".format(base_name, fmt)
+    stru_file = Path(folder) / f"{base_name}.{fmt}"
     if isinstance(stru, Crystal):
         write_crystal(stru, str(stru_file), fmt)
     else:
@@ -98,7 +98,7 @@ def save_res(recipe: FitRecipe, base_name: str, folder: str) -> Path:
     res_file : Path
         The path to the fitting result file.
     """
-    res_file = Path(folder) / "{}.res".format(base_name)
+    res_file = Path(folder) / f"{base_name}.res"
     res = FitResults(recipe)
     res.saveResults(str(res_file))
     return res_file
@@ -145,14 +145,14 @@ def save(
     for con_name, con in recipe.contributions.items():
         fgr_file = save_fgr(
             con,
-            "{}_{}".format(base_name, con_name),
+            f"{base_name}_{con_name}",
             folder
         )
         fgr_files.append(fgr_file)
         for gen_name, gen in con.generators.items():
             stru_file = save_stru(
                 gen.stru,
-                "{}_{}_{}".format(base_name, con_name, gen_name),
+                f"{base_name}_{con_name}_{gen_name}",
                 folder,
                 fmt=stru_fmt
             )
@@ -1,4 +1,12 @@
+import atexit
+import copy
+import functools
 import multiprocessing
+import re
+import weakref
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.pool import Pool
 from typing import Tuple, Union, Dict
 
 import matplotlib.pyplot as plt
@@ -31,6 +39,57 @@ __all__ = [
     'get_sgpars'
 ]
 
+# the axes of the fit plots, keyed by the contribution and dropped together with it
+_FIGCACHE: "weakref.WeakKeyDictionary[FitContribution, Axes]" = weakref.WeakKeyDictionary()
+
+# the arrays of the plotted data, keyed by the contribution and dropped together with it
+_DATACACHE: "weakref.WeakKeyDictionary[FitContribution, np.ndarray]" = weakref.WeakKeyDictionary()
+
+# the worker pools shared by the generators, keyed by the number of cpu
+_POOLS: Dict[int, Pool] = {}
+
+
+def _get_pool(ncpu: int) -> Pool:
+    """Get the worker pool with ncpu processes. The pool is created at the first call and reused after."""
+    pool = _POOLS.get(ncpu)
+    if pool is None:
+        pool = _POOLS[ncpu] = multiprocessing.Pool(ncpu)
+        atexit.register(pool.close)
+    return pool
+
+
+# the thread pools shared by the generators, keyed by the number of cpu
+_EXECUTORS: Dict[int, ThreadPoolExecutor] = {}
+
+
+def _get_executor(ncpu: int) -> ThreadPoolExecutor:
+    """Get the thread pool with ncpu workers. The pool is created at the first call and reused after."""
+    executor = _EXECUTORS.get(ncpu)
+    if executor is None:
+        executor = _EXECUTORS[ncpu] = ThreadPoolExecutor(ncpu)
+        atexit.register(executor.shutdown)
+    return executor
+
+
+def _thread_map(ncpu: int):
+    """Make a mapfunc running on the thread pool. The tasks of one evaluation share a single calculator, so
+    every task after the first gets a shallow copy of it and the threads never run on the same calculator.
+    The other arguments are only read and are shared."""
+    executor = _get_executor(ncpu)
+
+    def mapfunc(func, iterable):
+        args = []
+        seen = set()
+        for arg in iterable:
+            pqobj = arg["pqobj"]
+            if id(pqobj) in seen:
+                arg = dict(arg, pqobj=copy.copy(pqobj))
+            seen.add(id(pqobj))
+            args.append(arg)
+        return executor.map(func, args)
+
+    return mapfunc
+
 
 # functions used in fitting
 def make_profile(parser: MyParser, fit_range: Tuple[float, float, float]) -> Profile:
@@ -75,8 +134,8 @@ def make_generator(genconfig: GenConfig) -> Union[PDFGenerator, DebyePDFGenerato
     generator.setStructure(genconfig.structure, periodic=genconfig.structure)
     ncpu = genconfig.ncpu
     if ncpu:
-        pool = multiprocessing.Pool(ncpu)
-        generator.parallel(ncpu, mapfunc=pool.imap_unordered)
+        mapfunc = _thread_map(ncpu) if genconfig.threads else _get_pool(ncpu).imap_unordered
+        generator.parallel(ncpu, mapfunc=mapfunc)
     return generator
 
 
@@ -165,6 +224,13 @@ def fit(recipe: MyRecipe, **kwargs) -> None:
             bounds: two list of lower and upper bounds. Default get from recipe.
             xtol, gtol, ftol: tolerance in least squares. Default 1.E-5, 1.E-5, 1.E-5.
             max_nfev: maximum number of evaluation of residual function. Default None.
+            jac: the method to calculate the Jacobian. It can be a callable like recipe.jacobian.
+                Default '2-point'.
+            method: the algorithm in least squares. If None, use 'lm' when all the bounds are infinite, the loss
+                is linear, verbose < 2 and there are at least as many residuals as variables, else 'trf'.
+                Default 'trf'.
+            x_scale: the characteristic scale of each variable. Default 1.0.
+            loss, f_scale: the loss function and its soft margin. Default 'linear', 1.0.
     """
     values = kwargs.get("values", recipe.values)
     bounds = kwargs.get("bounds", recipe.getBounds2())
@@ -172,21 +238,51 @@ def fit(recipe: MyRecipe, **kwargs) -> None:
     xtol = kwargs.get("xtol", 1.E-5)
     gtol = kwargs.get("gtol", 1.E-5)
     ftol = kwargs.get("ftol", 1.E-5)
-    max_nfev = kwargs.get("max_fev", None)
-    least_squares(recipe.residual, values, bounds=bounds, verbose=verbose, xtol=xtol, gtol=gtol, ftol=ftol,
-                  max_nfev=max_nfev)
+    # "max_fev" is the old name of the argument
+    max_nfev = kwargs.get("max_nfev", kwargs.get("max_fev", None))
+    jac = kwargs.get("jac", "2-point")
+    x_scale = kwargs.get("x_scale", 1.0)
+    loss = kwargs.get("loss", "linear")
+    f_scale = kwargs.get("f_scale", 1.0)
+    method = kwargs.get("method", "trf")
+    if method is None:
+        method = _choose_method(recipe, bounds, loss, verbose)
+    result = least_squares(recipe.residual, values, jac=jac, bounds=bounds, method=method, verbose=verbose,
+                           xtol=xtol, gtol=gtol, ftol=ftol, x_scale=x_scale, loss=loss, f_scale=f_scale,
+                           max_nfev=max_nfev)
+    # the last evaluation may be a rejected step or a finite difference, so the solution is set back to the recipe
+    # and the next fit starts from it
+    if not np.array_equal(recipe.values, result.x):
+        recipe.residual(result.x)
     return
 
 
-def plot(contribution: FitContribution) -> Axes:
+def _choose_method(recipe: MyRecipe, bounds: tuple, loss: str, verbose: int) -> str:
+    """Choose 'lm' if MINPACK's Levenberg-Marquardt can solve the problem else 'trf'."""
+    unbounded = np.all(np.isinf(bounds[0])) and np.all(np.isinf(bounds[1]))
+    # the restraints only add residuals, so the points of the profiles are enough to check m >= n
+    m = sum(con.profile.y.size for con in recipe.contributions.values())
+    n = len(recipe.getNames())
+    return "lm" if unbounded and loss == "linear" and verbose < 2 and m >= n else "trf"
+
+
+def plot(contribution: FitContribution, show: bool = True) -> Axes:
     """
     Plot the fits for all FitContributions in the recipe.
 
+    The figure of a contribution is created at the first call and reused in the later calls on the same
+    contribution object unless it has been closed. A later call clears the axes returned by the earlier call
+    and draws the current fit on it, so the same axes is returned. Close the figure to get a new one. The array
+    holding the plotted data is reused in the same way.
+
     Parameters
     ----------
     contribution : FitContribution
         The FitRecipe.
 
+    show : bool
+        If True, show the figure without blocking. Default True.
+
     Returns
     -------
     ax : Axes
@@ -195,11 +291,18 @@ def plot(contribution: FitContribution) -> Axes:
     r = contribution.profile.x
     g = contribution.profile.y
     gcalc = contribution.profile.ycalc
-    gdiff = g - gcalc
-    data = np.stack([r, g, gcalc, gdiff])
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
+    # the visualizer calculates the difference curve from the first three rows by itself
+    data = _DATACACHE.get(contribution)
+    if data is None or data.shape != (3, r.shape[0]):
+        data = _DATACACHE[contribution] = np.empty((3, r.shape[0]))
+    np.stack([r, g, gcalc], out=data)
+
+    ax = _FIGCACHE.get(contribution)
+    if ax is not None and plt.fignum_exists(ax.figure.number):
+        ax.cla()
+    else:
+        fig = plt.figure()
+        ax = _FIGCACHE[contribution] = fig.add_subplot(111)
     ax = visualize(
         data,
         ax=ax,
@@ -208,7 +311,8 @@ def plot(contribution: FitContribution) -> Axes:
         label="gr"
     )
     ax.set_title(contribution.name)
-    plt.show(block=False)
+    if show:
+        plt.show(block=False)
     return ax
 
 
@@ -250,13 +354,7 @@ def cfconstrain(recipe: MyRecipe, con_name: str, param_names: list = None, dv: D
     con: MyContribution = getattr(recipe, con_name)
     if param_names is None:
         # get all the parameter in the contribution except the independent variable
-        pars = {
-            arg
-            for eq in con.eqfactory.equations
-            if eq.name == "eq"
-            for arg in eq.args
-            if arg.name != con.xname
-        }
+        pars = con.eqargs.values()
     else:
         pars = {getattr(con, param_name) for param_name in param_names}
     for par in pars:
@@ -350,16 +448,15 @@ def sgconstrain(recipe: MyRecipe, con_name: str, gen_name: str, sg: Union[int, s
         variables[name] = recipe.addVar(par, name=name, value=dv.get(name, par.value),
                                         tag=f'lat_{gen.name}').boundRange(*bounds.get(name, (0., 2. * par.value)))
     # constrain adps
-    atoms = gen.phase.getScatterers()
-    elements = set([atom.element for atom in atoms])
-    adp = dict()
-    for element in elements:
+    bisos = defaultdict(list)
+    for atom in gen.phase.getScatterers():
+        bisos[atom.element].append(atom.Biso)
+    for element, pars in bisos.items():
         name = f'Biso_{only_alpha(element)}_{gen.name}'
-        variables[name] = adp[element] = recipe.newVar(name, value=dv.get(name, 0.05),
-                                                       tag=f'adp_{gen.name}').boundRange(
+        variables[name] = recipe.newVar(name, value=dv.get(name, 0.05), tag=f'adp_{gen.name}').boundRange(
             *bounds.get(name, (0, np.inf)))
-    for atom in atoms:
-        recipe.constrain(getattr(atom, 'Biso'), adp[atom.element])
+        for par in pars:
+            recipe.constrain(par, variables[name])
     # add xyzpars
     if add_xyz:
         for par in sgpars.xyzpars:
@@ -386,9 +483,16 @@ def get_sgpars(parset: Union[ObjCrystCrystalParSet, DiffpyStructureParSet], sg:
                 "No explicit space group for DiffpyStructureParSet. "
                 "Use 'P1' symmetry."
             )
-        sgpars = constrainAsSpaceGroup(
-            parset, sg, constrainadps=False
-        )
+        # the constrained parameters refer to the parset so they are cached in it to share its lifetime
+        # the special positions depend on the atoms, their coordinates and the lattice, so they are in the key
+        cache = parset.__dict__.setdefault("_sgpars_cache", dict())
+        atoms = tuple((atom.name, atom.x.value, atom.y.value, atom.z.value) for atom in parset.getScatterers())
+        key = (sg, atoms, tuple(par.value for par in parset.getLattice()))
+        sgpars = cache.get(key)
+        if sgpars is None:
+            sgpars = cache[key] = constrainAsSpaceGroup(
+                parset, sg, constrainadps=False
+            )
     else:
         raise ValueError(
             "{} does not allow space group constrain.".format(type(parset))
@@ -422,6 +526,10 @@ def sgconstrain_all(recipe: MyRecipe, dv: dict = None, bounds: dict = None) -> d
     return variables
 
 
+_NON_ALPHA = re.compile(r"[\W\d_]+")
+
+
+@functools.lru_cache(maxsize=None)
 def only_alpha(s: str):
     """Remove all characters other than alphabets. Use to get a valid variable name."""
-    return ''.join((c for c in s if c.isalpha()))
+    return _NON_ALPHA.sub('', s)
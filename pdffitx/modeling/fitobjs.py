@@ -72,12 +72,16 @@ class MyParser(PDFParser):
         """
         if meta is None:
             meta = {}
+        if data.ndim != 2:
+            raise ValueError("Data is not a two dimensional array.")
         if data.shape[0] < 2:
             raise ValueError("Data dimension less than 2.")
         if data.shape[0] > 4:
             raise ValueError("Data dimension larger than 4.")
+        if not data.flags.c_contiguous:
+            data = np.ascontiguousarray(data)
         self._banks.append(
-            [_ for _ in data] + [None] * (4 - data.shape[0])
+            list(data) + [None] * (4 - data.shape[0])
         )
         self._meta = meta
         return
@@ -86,7 +90,9 @@ class MyParser(PDFParser):
         """Parse the data and metadta from pdfgetter."""
         if meta is None:
             meta = {}
-        data = np.stack(pdfgetter.gr)
+        data = pdfgetter.gr
+        if not (isinstance(data, ndarray) and data.ndim == 2):
+            data = np.stack(data)
         pdfconfig: PDFConfig = pdfgetter.config
         other_meta = {
             'stype': map_stype(pdfconfig.mode),
@@ -118,16 +124,21 @@ class GenConfig:
 
     ncpu : int
         number of parallel computing cores for the generator. If None, no parallel. Default None.
+
+    threads : bool
+        If True, run the parallel computing in a pool of threads instead of a pool of processes. It only helps when
+        the calculator releases the GIL. Default False.
     """
 
     def __init__(self, name: str, structure: Stru, periodic: bool = None, debye: bool = None,
-                 ncpu: int = None):
+                 ncpu: int = None, threads: bool = False):
         """Initiate the GenConfig."""
         self.name = name
         self.structure = structure
         self.periodic = self.is_periodic(structure) if periodic is None else periodic
         self.debye = not self.periodic if debye is None else debye
         self.ncpu = ncpu
+        self.threads = threads
 
     @staticmethod
     def is_periodic(structure: Stru) -> bool:
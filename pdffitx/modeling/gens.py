@@ -1,5 +1,17 @@
+import math
+
 import numpy as np
 from diffpy.srfit.fitbase import ProfileGenerator
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def _gauss(x, a, x0, sigma, out):
+    """Fill the out with a * exp(-0.5 * (x - x0) ** 2 / sigma ** 2) in a single pass."""
+    for i in range(x.shape[0]):
+        d = (x[i] - x0) / sigma
+        out[i] = a * math.exp(-0.5 * d * d)
+    return out
 
 
 class GaussianGenerator(ProfileGenerator):
@@ -41,10 +53,16 @@ class GaussianGenerator(ProfileGenerator):
         # Here we create new Parameters using the '_newParameter' method of
         # ProfileGenerator. The signature is
         # _newParameter(name, value).
-        # See the API for full details.
-        self._newParameter('A', 1.0)
-        self._newParameter('x0', 0.0)
-        self._newParameter('sigma', 1.0)
+        # See the API for full details. The Parameters are also bound to the
+        # instance so that __call__ doesn't look them up by name every time.
+        self._A = self._newParameter('A', 1.0)
+        self._x0 = self._newParameter('x0', 0.0)
+        self._sigma = self._newParameter('sigma', 1.0)
+        # The output buffer is reused as long as the independent variable is the same array.
+        self._x = None
+        self._out = None
+        # Compile the kernel at construction so that the fitting doesn't pay for it.
+        _gauss(np.zeros(1), 1.0, 0.0, 1.0, np.empty(1))
         return
 
     def __call__(self, x):
@@ -54,16 +72,47 @@ class GaussianGenerator(ProfileGenerator):
         x. We will define it as we did in gaussianrecipe.py.
 
         """
-        # First we must get the values of the Parameters. Since we used
-        # _newParameter to create them, the Parameters are accessible as
-        # attributes by name.
-        a = self.A.value
-        x0 = self.x0.value
-        sigma = self.sigma.value
-
-        # Now we can use them. Note that we imported exp from numpy at the top
-        # of the module.
-        y = a * np.exp(-0.5 * (x - x0) ** 2 / sigma ** 2)
+        # The caller owns the returned array so it is copied out of the buffer.
+        return self._evaluate(x).copy()
+
+    def operation(self):
+        """Evaluate the profile on the x of the profile for the FitContribution.
 
-        # Now return the value.
-        return y
+        The result is the internal buffer, which is overwritten in the next evaluation.
+
+        """
+        return self._evaluate(self.profile.x)
+
+    def _evaluate(self, x):
+        """Calculate the profile into the internal buffer and return the buffer."""
+        # First we must get the values of the Parameters. We use the bound
+        # Parameters instead of the attributes by name to skip the lookup.
+        a = self._A.value
+        x0 = self._x0.value
+        sigma = self._sigma.value
+
+        # Now we can use them. The kernel writes the profile into a buffer that
+        # is only reallocated when x changes.
+        x = np.asarray(x, dtype=float)
+        if self._out is None or x is not self._x or self._out.shape != x.shape:
+            self._x = x
+            self._out = np.empty_like(x)
+        return _gauss(x, a, x0, sigma, self._out)
+
+    def derivatives(self, x):
+        """Calculate the derivatives of the profile with respect to the Parameters.
+
+        The derivatives are analytic and used in the Jacobian of the recipe. They
+        are returned in a dictionary keyed by the Parameters.
+
+        """
+        a = self._A.value
+        x0 = self._x0.value
+        sigma = self._sigma.value
+        y = a * np.exp(-0.5 * (x - x0) ** 2 / sigma ** 2)
+        d = (x - x0) / sigma
+        return {
+            self._A: y / a if a != 0. else np.exp(-0.5 * d ** 2),
+            self._x0: y * d / sigma,
+            self._sigma: y * d ** 2 / sigma
+        }
@@ -1,3 +1,4 @@
+import functools
 import inspect
 import typing as tp
 
@@ -186,6 +187,9 @@ def optimize(recipe: MyRecipe, tags: tp.List[tp.Union[str, tp.Iterable[str]]],
              **kwargs):
     """First fix all variables and then free the variables one by one and fit the recipe.
 
+    Each round starts from the solution of the previous round. The newly freed variables start from their
+    current values.
+
     Parameters
     ----------
     recipe
@@ -240,12 +244,12 @@ def report(recipe: MyRecipe) -> FitResults:
     res : FitResults
         The object contains the fit results.
     """
-    res = FitResults(recipe)
+    res = recipe.getResults()
     res.printResults()
     return res
 
 
-def view_fits(recipe: MyRecipe) -> tp.List[Axes]:
+def view_fits(recipe: MyRecipe, show: bool = True) -> tp.List[Axes]:
     """View the fit curves. Each FitContribution will be a plot.
 
     Parameters
@@ -253,6 +257,9 @@ def view_fits(recipe: MyRecipe) -> tp.List[Axes]:
     recipe : MyRecipe
         The recipe after refinement.
 
+    show : bool
+        If True, show the figures without blocking. Default True.
+
     Returns
     -------
     axes : a list of Axes
@@ -260,7 +267,7 @@ def view_fits(recipe: MyRecipe) -> tp.List[Axes]:
     """
     axes = []
     for con in recipe.contributions.values():
-        ax = plot(con)
+        ax = plot(con, show=show)
         axes.append(
             ax
         )
@@ -269,10 +276,13 @@ def view_fits(recipe: MyRecipe) -> tp.List[Axes]:
 
 def add_suffix(func: tp.Callable, suffix: str) -> tp.List[str]:
     """Add the suffix to the argument names starting at the second the argument. Return the names"""
-    args = inspect.getfullargspec(func).args
-    return list(
-        map(
-            lambda arg: '{}_{}'.format(arg, suffix) if arg != "r" else arg,
-            args
-        )
-    )
+    return [arg if arg == "r" else f"{arg}_{suffix}" for arg in _arg_names(func)]
+
+
+@functools.lru_cache(maxsize=None)
+def _arg_names(func: tp.Callable) -> tp.Tuple[str, ...]:
+    """Get the names of the positional arguments of the function. The plain functions are read from the code."""
+    code = getattr(func, "__code__", None)
+    if code is None or hasattr(func, "__wrapped__"):
+        return tuple(inspect.getfullargspec(func).args)
+    return code.co_varnames[:code.co_argcount]
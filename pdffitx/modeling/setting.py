@@ -60,6 +60,23 @@ def get_variable(recipe: MyRecipe, name: str, ignore: bool = False) -> Parameter
     return variable
 
 
+def iter_variables(
+    recipe: MyRecipe, names: tp.Iterable[str], ignore: bool = False
+) -> tp.Generator[tp.Tuple[str, Parameter], None, None]:
+    """Yield the names and the fitting parameters in the recipe. If ignore, skip the names not found.
+
+    The variables are looked up in the dictionary of the recipe variables first and only the other names go
+    through the `get_variable`.
+    """
+    variables = recipe._parameters
+    for name in names:
+        variable = variables.get(name)
+        if variable is None:
+            variable = get_variable(recipe, name, ignore=ignore)
+        if variable:
+            yield name, variable
+
+
 def set_values(recipe: MyRecipe, values: tp.Dict[str, float], ignore: bool = False) -> MyRecipe:
     """Set the values of fitting parameters in the recipe.
 
@@ -79,10 +96,8 @@ def set_values(recipe: MyRecipe, values: tp.Dict[str, float], ignore: bool = Fal
     recipe :
         The input recipe with operation done in place.
     """
-    for name, value in values.items():
-        variable = get_variable(recipe, name, ignore=ignore)
-        if variable:
-            variable.setValue(value)
+    for name, variable in iter_variables(recipe, values, ignore=ignore):
+        variable.setValue(values[name])
     return recipe
 
 
@@ -133,10 +148,8 @@ def bound_ranges(
         e. g. bound (0.1, 1.1) means that the lower bound is 10% and the upper bound is 110% of the initial
         value of the variable.
     """
-    for name, bound in bounds.items():
-        variable = get_variable(recipe, name, ignore=ignore)
-        if variable:
-            bound_range(variable, bound, ratio=ratio)
+    for name, variable in iter_variables(recipe, bounds, ignore=ignore):
+        bound_range(variable, bounds[name], ratio=ratio)
     return
 
 
@@ -145,8 +158,7 @@ def bound_range(variable: Parameter, bound: tp.Union[tp.Tuple, tp.Dict], ratio:
     value = variable.getValue()
     if isinstance(bound, dict):
         if ratio:
-            for k, r in bound.items():
-                bound[k] = value * r
+            bound = {k: value * r for k, r in bound.items()}
         variable.boundRange(**bound)
     else:
         if ratio:
@@ -178,10 +190,8 @@ def bound_windows(
         e. g. bound (0.1, 0.2) means that the lower bound is 90% and the upper bound is 120% of the initial
         value of the variable.
     """
-    for name, bound in bounds.items():
-        variable = get_variable(recipe, name, ignore=ignore)
-        if variable:
-            bound_window(variable, bound, ratio=ratio)
+    for name, variable in iter_variables(recipe, bounds, ignore=ignore):
+        bound_window(variable, bounds[name], ratio=ratio)
     return
 
 
@@ -192,8 +202,7 @@ def bound_window(
     value = variable.getValue()
     if isinstance(bound, dict):
         if ratio:
-            for k, r in bound.items():
-                bound[k] = value * r
+            bound = {k: value * r for k, r in bound.items()}
         variable.boundWindow(**bound)
     elif isinstance(bound, float):
         if ratio:
@@ -1,13 +1,17 @@
-from pathlib import Path
-from tempfile import TemporaryDirectory
+from io import StringIO
+from operator import itemgetter
 
 import ase.io
 from ase import Atoms, Atom
 from ase.spacegroup import crystal
-from diffpy.structure import loadStructure
+from diffpy.structure.parsers import getParser
 
 import pdffitx.parsers.tools as tools
 
+_get_position = itemgetter("x", "y", "z")
+_get_cellpar = itemgetter("a", "b", "c", "alpha", "beta", "gamma")
+_get_occ = itemgetter("occ")
+
 
 def dict_to_atoms(dct: dict, keys: tuple = ("genresults", 0), **kwargs) -> Atoms:
     """Parse the structure information inside a document into an ase.Atoms object."""
@@ -33,22 +37,18 @@ def atom_dict_to_atom(dct: dict) -> Atom:
     return Atom(
         symbol=tools.only_letter(dct["element"]),
         tag=int(tools.only_digit(dct["name"])),
-        position=(dct["x"], dct["y"], dct["z"]),
+        position=_get_position(dct),
     )
 
 
 def lat_dict_to_list(dct: dict) -> list:
     """Make a dictionary of lattice information to a 6-vector [a, b, c, alpha, beta, gamma]."""
-    return [
-        dct[k] for k in ("a", "b", "c", "alpha", "beta", "gamma")
-    ]
+    return list(_get_cellpar(dct))
 
 
 def get_occ_list(lst: list) -> list:
     """Get the occupancies list from a list of atom information dictionary."""
-    return [
-        doc["occ"] for doc in lst
-    ]
+    return list(map(_get_occ, lst))
 
 
 def dict_to_atoms2(dct: dict, keys: tuple = ("genresults", 0, "stru_str")) -> Atoms:
@@ -72,10 +72,6 @@ def dict_to_atoms2(dct: dict, keys: tuple = ("genresults", 0, "stru_str")) -> At
 
 def str_to_atoms(stru_str: str) -> Atoms:
     """Convert the cif files string to an ase.Atoms object."""
-    with TemporaryDirectory() as temp_dir:
-        cif_file = Path(temp_dir) / "temp.cif"
-        cif_file.write_text(stru_str)
-        stru = loadStructure(str(cif_file))
-        stru.write(str(cif_file), format="cif")
-        atoms = ase.io.read(str(cif_file))
-    return atoms
+    # the structure is expanded and rewritten by diffpy.structure before read by ase, all in memory
+    stru = getParser("cif").parse(stru_str)
+    return ase.io.read(StringIO(stru.writeStr("cif")), format="cif")
@@ -1,6 +1,7 @@
 """Parse the data in calculator."""
+import functools
 import typing as tp
-from collections import defaultdict
+from operator import attrgetter
 
 from diffpy.srreal.bvscalculator import BVSCalculator
 from numpy import ndarray
@@ -9,15 +10,29 @@ from xarray import Dataset
 
 def yield_name_attr(obj: object) -> tp.Generator[tp.Tuple[str, tp.Union[float, int, str], int], None, None]:
     """Find float, int, str and ndarray in the attributes. Yield attribute name, value and dimension."""
-    for name in dir(obj):
-        if not name.startswith("_"):
-            attr = getattr(obj, name)
-            if isinstance(attr, (float, int, str)):
-                yield name, attr, 0
-            elif isinstance(attr, ndarray):
-                yield name, attr, len(attr.shape)
-            else:
-                pass
+    for name in _public_names(obj):
+        attr = getattr(obj, name)
+        if isinstance(attr, (float, int, str)):
+            yield name, attr, 0
+        elif isinstance(attr, ndarray):
+            yield name, attr, len(attr.shape)
+        else:
+            pass
+
+
+def _public_names(obj: object) -> tp.Sequence[str]:
+    """Get the sorted public attribute names of the object like the dir does."""
+    names = _public_class_names(type(obj))
+    instance_names = [name for name in getattr(obj, "__dict__", ()) if not name.startswith("_")]
+    if instance_names:
+        return sorted(set(names).union(instance_names))
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def _public_class_names(cls: type) -> tp.Tuple[str, ...]:
+    """Get the sorted public attribute names of the class. They are found once for each class."""
+    return tuple(name for name in dir(cls) if not name.startswith("_"))
 
 
 def bvs_to_xarray(calculator: BVSCalculator, dim_name: str = "site") -> Dataset:
@@ -28,9 +43,12 @@ def bvs_to_xarray(calculator: BVSCalculator, dim_name: str = "site") -> Dataset:
             data[name] = (dim_name, attr)
         else:
             data[name] = attr
-    coords = defaultdict(lambda: (dim_name, list()))
-    for atom in calculator.getStructure():
-        for name, attr, dim in yield_name_attr(atom):
-            if dim == 0:
-                coords[name][1].append(attr)
+    structure = calculator.getStructure()
+    coords = dict()
+    if len(structure) > 0:
+        # the atoms share the same class so the attributes are found once in the first atom
+        names = [name for name, attr, dim in yield_name_attr(structure[0]) if dim == 0]
+        for name in names:
+            getter = attrgetter(name)
+            coords[name] = (dim_name, [getter(atom) for atom in structure])
     return Dataset(data_vars=data, coords=coords)
@@ -29,12 +29,35 @@ def dicts_to_array(dcts: tp.Iterable[dict], keys: tuple = ("conresults", 0),
         The numpy array of data. Axis 0 is corresponding to the dictionaries and Axis 1 is correspongding to a
         list in the dictionary.
     """
-    return np.stack(
-        [
-            dict_to_array(dct, keys=keys, data_keys=data_keys, **kwargs) for dct in dcts
-        ],
-        **kwargs
-    )
+    dcts = list(dcts)
+    if kwargs or not dcts:
+        return np.stack(
+            [
+                dict_to_array(dct, keys=keys, data_keys=data_keys, **kwargs) for dct in dcts
+            ],
+            **kwargs
+        )
+    # copy the data into a single preallocated array instead of stacking twice
+    first = [np.asarray(data) for data in _get_data(dcts[0], keys, data_keys)]
+    array = np.empty((len(dcts), len(first)) + first[0].shape, dtype=np.result_type(*first))
+    array[0] = first
+    for i in range(1, len(dcts)):
+        for j, data in enumerate(_get_data(dcts[i], keys, data_keys)):
+            data = np.asarray(data)
+            if data.shape != first[j].shape:
+                raise ValueError(
+                    "The data of the dictionary {} doesn't have the shape {}.".format(i, first[j].shape)
+                )
+            if not np.can_cast(data.dtype, array.dtype):
+                array = array.astype(np.result_type(array, data))
+            array[i, j] = data
+    return array
+
+
+def _get_data(dct: dict, keys: tuple, data_keys: tuple) -> list:
+    """Get the data of the data keys in the sub-dictionary found by the key chain."""
+    data_dct = tools.get_value(dct, keys)
+    return [data_dct[key] for key in data_keys]
 
 
 def dict_to_array(dct: dict, keys: tuple = tuple(), data_keys: tuple = ("x", "y", "ycalc"), **kwargs) -> np.array:
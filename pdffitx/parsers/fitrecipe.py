@@ -1,7 +1,8 @@
 import math
 import typing as tp
-from tempfile import TemporaryDirectory
+from io import StringIO
 
+import numpy as np
 from diffpy.srfit.fitbase.fitresults import FitResults, ContributionResults
 from diffpy.srfit.pdf import PDFGenerator, DebyePDFGenerator
 from diffpy.srfit.structure.srrealparset import SrRealParSet
@@ -10,14 +11,18 @@ from pyobjcryst.crystal import Crystal
 from pyobjcryst.spacegroup import SpaceGroup
 
 from pdffitx.modeling import MyRecipe, MyContribution
-from pdffitx.modeling.exporter import save_stru
 
 GEN = tp.Union[PDFGenerator, DebyePDFGenerator]
 
 
+def _values_to_dict(parset: SrRealParSet) -> dict:
+    """Map the names of the parameters in the parameter set to their values in a single pass."""
+    return {name: par.value for name, par in parset._parameters.items()}
+
+
 def lattice_to_dict(lattice: SrRealParSet, angunits="rad") -> dict:
     """Convert lattice parameter set to dictionary. If angle is in radian, convert it to degree."""
-    dct = dict(zip(lattice.getNames(), lattice.getValues()))
+    dct = _values_to_dict(lattice)
     if angunits == "rad":
         for angle in ('alpha', 'beta', 'gamma'):
             dct[angle] = math.degrees(dct[angle])
@@ -26,13 +31,9 @@ def lattice_to_dict(lattice: SrRealParSet, angunits="rad") -> dict:
 
 def atom_to_dict(atom: SrRealParSet) -> dict:
     """Convert atom parameter set to dictionary."""
-    dct = dict(zip(atom.getNames(), atom.getValues()))
-    dct.update(
-        {
-            'name': atom.name,
-            'element': atom.element
-        }
-    )
+    dct = _values_to_dict(atom)
+    dct['name'] = atom.name
+    dct['element'] = atom.element
     return dct
 
 
@@ -52,7 +53,7 @@ def phase_to_dict(phase: SrRealParSet) -> dict:
     """Convert structure parameter set to dictionary."""
     return {
         'lattice': lattice_to_dict(phase.getLattice(), angunits=getattr(phase, 'angunits', 'deg')),
-        'atoms': [atom_to_dict(atom) for atom in phase.getScatterers()],
+        'atoms': list(map(atom_to_dict, phase.getScatterers())),
         'space_group': get_space_group_number(phase)
     }
 
@@ -64,31 +65,36 @@ def get_genresults(recipe: MyRecipe) -> tp.Generator:
             yield dict(name=gen_name, con_name=con_name, **phase_to_dict(gen.phase))
 
 
-def conresult_to_dict(result: ContributionResults) -> dict:
-    """Convert fit contribution result to dictionary."""
+def _as_output(array: np.ndarray, to_list: bool) -> tp.Union[list, np.ndarray]:
+    """Convert the array to a list if to_list else copy the array, so that the cached results are not shared."""
+    return array.tolist() if to_list else np.array(array)
+
+
+def conresult_to_dict(result: ContributionResults, to_list: bool = True) -> dict:
+    """Convert fit contribution result to dictionary. If to_list, the arrays are converted to lists."""
     return {
-        'x': result.x.tolist(),
-        'y': result.y.tolist(),
-        'dy': result.dy.tolist(),
-        'ycalc': result.ycalc.tolist(),
+        'x': _as_output(result.x, to_list),
+        'y': _as_output(result.y, to_list),
+        'dy': _as_output(result.dy, to_list),
+        'ycalc': _as_output(result.ycalc, to_list),
         'rw': result.rw,
         'chi2': result.chi2,
         'residual': result.residual
     }
 
 
-def fitresult_to_dict(result: FitResults) -> dict:
-    """Convert fit result to dictionary."""
+def fitresult_to_dict(result: FitResults, to_list: bool = True) -> dict:
+    """Convert fit result to dictionary. If to_list, the arrays are converted to lists."""
     return {
-        'varnames': result.varnames,
-        'varvals': result.varvals.tolist(),
-        'varunc': result.varunc,
-        'connames': result.connames,
-        'convals': result.convals,
-        'conunc': result.conunc,
-        'fixednames': result.fixednames,
-        'fixedvals': result.fixedvals,
-        'cov': result.cov.tolist(),
+        'varnames': list(result.varnames),
+        'varvals': _as_output(result.varvals, to_list),
+        'varunc': list(result.varunc),
+        'connames': list(result.connames),
+        'convals': list(result.convals),
+        'conunc': list(result.conunc),
+        'fixednames': list(result.fixednames),
+        'fixedvals': list(result.fixedvals),
+        'cov': _as_output(result.cov, to_list),
         'residual': result.residual,
         'penalty': result.penalty,
         'chi2': result.chi2,
@@ -101,18 +107,19 @@ def fitresult_to_dict(result: FitResults) -> dict:
 
 def get_conresults(
     conresults: tp.Dict[str, ContributionResults],
-    cons: tp.Dict[str, MyContribution]
+    cons: tp.Dict[str, MyContribution],
+    to_list: bool = True
 ) -> tp.Generator:
     for name, conresult in conresults.items():
         con = cons[name]
         yield dict(
             name=name,
             eq=con.getEquation(),
-            **conresult_to_dict(conresult)
+            **conresult_to_dict(conresult, to_list=to_list)
         )
 
 
-def recipe_to_dict(recipe: MyRecipe) -> dict:
+def recipe_to_dict(recipe: MyRecipe, to_list: bool = True) -> dict:
     """Convert the fit result in recipe to a parsers friendly dictionary.
 
     Parameters
@@ -120,23 +127,29 @@ def recipe_to_dict(recipe: MyRecipe) -> dict:
     recipe : MyRecipe
         The refined recipe.
 
+    to_list : bool
+        If True, the arrays are converted to lists so that the dictionary can be saved in the database. Else, they
+        are kept as ndarrays, which is faster if the dictionary is only used in memory. Default True.
+
     Returns
     -------
     doc : dict
         A nested dictionary containing fitting results, fitted data and the refined structure data.
     """
-    result = FitResults(recipe)
-    doc = fitresult_to_dict(result)
-    doc['conresults'] = list(get_conresults(result.conresults, recipe.contributions))
+    result = recipe.getResults()
+    doc = fitresult_to_dict(result, to_list=to_list)
+    doc['conresults'] = list(get_conresults(result.conresults, recipe.contributions, to_list=to_list))
     doc["genresults"] = list(get_genresults(recipe))
     return doc
 
 
 def structure_to_str(structure: tp.Union[Structure, Crystal]) -> str:
-    """Read the content structure file of the structure and return a string."""
-    with TemporaryDirectory() as temp_dir:
-        stru_file = save_stru(structure, "temp", temp_dir)
-        return stru_file.read_text()
+    """Write the structure in a cif string."""
+    if isinstance(structure, Crystal):
+        buffer = StringIO()
+        structure.CIFOutput(buffer)
+        return buffer.getvalue()
+    return structure.writeStr(format="cif")
 
 
 def get_genresults2(recipe: MyRecipe) -> tp.Generator:
@@ -146,7 +159,7 @@ def get_genresults2(recipe: MyRecipe) -> tp.Generator:
             yield dict(name=gen_name, con_name=con_name, stru_str=structure_to_str(gen.stru))
 
 
-def recipe_to_dict2(recipe: MyRecipe) -> dict:
+def recipe_to_dict2(recipe: MyRecipe, to_list: bool = True) -> dict:
     """Convert the fit result in recipe to a parsers friendly dictionary.
 
     Parameters
@@ -154,13 +167,17 @@ def recipe_to_dict2(recipe: MyRecipe) -> dict:
     recipe : MyRecipe
         The refined recipe.
 
+    to_list : bool
+        If True, the arrays are converted to lists so that the dictionary can be saved in the database. Else, they
+        are kept as ndarrays, which is faster if the dictionary is only used in memory. Default True.
+
     Returns
     -------
     doc : dict
         A nested dictionary containing fitting results, fitted data and the refined structure data.
     """
-    result = FitResults(recipe)
-    doc = fitresult_to_dict(result)
-    doc['conresults'] = list(get_conresults(result.conresults, recipe.contributions))
+    result = recipe.getResults()
+    doc = fitresult_to_dict(result, to_list=to_list)
+    doc['conresults'] = list(get_conresults(result.conresults, recipe.contributions, to_list=to_list))
     doc["genresults"] = list(get_genresults2(recipe))
     return doc
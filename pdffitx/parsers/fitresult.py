@@ -1,4 +1,5 @@
 """Parse fit results."""
+import functools
 import typing as tp
 
 import pandas as pd
@@ -15,10 +16,10 @@ def to_dataframe(
     index_name: str = None
 ):
     """Convert the fitting results to a dataframe"""
-    arr = to_xarray(dct, column, index, data)
-    df = arr.to_dataframe()
-    df.rename_axis(index_name, inplace=True)
-    return df
+    return pd.DataFrame(
+        {get_value(dct, column): get_value(dct, data)},
+        index=pd.Index(get_value(dct, index), name=index_name)
+    )
 
 
 def to_xarray(
@@ -57,34 +58,37 @@ def to_xarray(
     )
 
 
+def _make_rename_rules() -> tp.Dict[str, tp.Tuple[int, str, bool]]:
+    """Make the table from a word to its rank, its latex text and whether the text has the site in it."""
+    ang, ang2 = r" ($\mathrm{\AA}$)", r" ($\mathrm{\AA}^2$)"
+    rules = [("scale", "scale", False), ("delta2", r"$\delta_2$" + ang2, False),
+             ("delta1", r"$\delta_1$" + ang, False)]
+    rules.extend((word, word + ang, False) for word in ("a", "b", "c"))
+    rules.extend((word, rf"$\{word}$" + " (deg)", False) for word in ("alpha", "beta", "gamma"))
+    rules.extend(
+        (word, rf"{word[0]}$_{{{word[1:]}}}$(%s)" + ang2, True) for word in (
+            'Uiso', 'U11', 'U12', 'U13', 'U21', 'U22', 'U23', 'U31', 'U32', 'U33',
+            'Biso', 'B11', 'B12', 'B13', 'B21', 'B22', 'B23', 'B31', 'B32', 'B33',
+        )
+    )
+    rules.extend((word, f"{word}(%s)" + ang, True) for word in ("x", "y", "z"))
+    rules.extend((word, word + ang, False) for word in ("psize", "psig", "sthick", "thickness", "radius"))
+    return {word: (rank, text, site) for rank, (word, text, site) in enumerate(rules)}
+
+
+# the words earlier in the rules win if a name has several of them
+_RENAME_RULES = _make_rename_rules()
+
+
+@functools.lru_cache(maxsize=None)
 def rename_rule(name: str) -> str:
-    """A conventional rule to rename the parameter name to latex version."""
+    """A conventional rule to rename the parameter name to latex version. The results are cached by the name."""
     words = name.split("_")
-    if "scale" in words:
-        return "scale"
-    if "delta2" in words:
-        return r"$\delta_2$ ($\mathrm{\AA}^2$)"
-    if "delta1" in words:
-        return r"$\delta_1$ ($\mathrm{\AA}$)"
-    for word in ("a", "b", "c"):
-        if word in words:
-            return word + r" ($\mathrm{\AA}$)"
-    for word in ("alpha", "beta", "gamma"):
-        if word in words:
-            return rf"$\{word}$" + " (deg)"
-    for word in (
-        'Uiso', 'U11', 'U12', 'U13', 'U21', 'U22', 'U23', 'U31', 'U32', 'U33',
-        'Biso', 'B11', 'B12', 'B13', 'B21', 'B22', 'B23', 'B31', 'B32', 'B33',
-    ):
-        if word in words:
-            return rf"{word[0]}$_{{{word[1:]}}}$({words[1]})" + r" ($\mathrm{\AA}^2$)"
-    for word in ("x", "y", "z"):
-        if word in words:
-            return rf"{word}({words[1]})" + r" ($\mathrm{\AA}$)"
-    for word in ("psize", "psig", "sthick", "thickness", "radius"):
-        if word in words:
-            return rf"{word}" + r" ($\mathrm{\AA}$)"
-    return " ".join(words[1:])
+    matches = [_RENAME_RULES[word] for word in words if word in _RENAME_RULES]
+    if not matches:
+        return " ".join(words[1:])
+    _, text, site = min(matches)
+    return text % words[1] if site else text
 
 
 def to_latex(*ndfs: tp.Tuple[str, pd.DataFrame]) -> str:
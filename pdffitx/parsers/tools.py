@@ -1,5 +1,9 @@
+import re
 import typing as tp
 
+_NON_LETTER = re.compile(r"[\W\d_]+")
+_NON_DIGIT = re.compile(r"\D+")
+
 
 def get_value(dct: dict, keys: tuple) -> tp.Any:
     """Get the value by walking along a key chain."""
@@ -11,9 +15,9 @@ def get_value(dct: dict, keys: tuple) -> tp.Any:
 
 def only_letter(s: str) -> str:
     """Filter out letters in the string."""
-    return ''.join([c for c in s if c.isalpha()])
+    return _NON_LETTER.sub('', s)
 
 
 def only_digit(s: str) -> str:
     """Filter out the digits in the string."""
-    return ''.join([c for c in s if c.isdigit()])
+    return _NON_DIGIT.sub('', s)
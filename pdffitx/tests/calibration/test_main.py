@@ -1,5 +1,3 @@
-import matplotlib.pyplot as plt
-
 from pdffitx.calibration.main import calib_pipe
 
 
@@ -8,4 +6,3 @@ def test_calib_pipe(db):
         db['ai'], db['Ni_img'], db['Ni_config'], db['Ni_stru'],
         fit_range=(2., 10., .1), qdamp0=0.04, qbroad0=0.02
     )
-    plt.close()
@@ -1,7 +1,13 @@
 """Configuration of pytest."""
+import copy
+import functools
+import typing as tp
+from collections.abc import Mapping
+
 import diffpy.srfit.pdf.characteristicfunctions as F
+import matplotlib
+import matplotlib.pyplot as plt
 import numpy
-import pyFAI
 import pytest
 from diffpy.pdfgetx import PDFConfig, PDFGetter
 from diffpy.structure import loadStructure
@@ -14,53 +20,78 @@ from pdffitx.io import load_parser, load_img, load_array
 from pdffitx.modeling.adding import initialize
 # data file
 from pdffitx.modeling.creating import create
+from pdffitx.modeling.fitobjs import MyParser
 from pdffitx.modeling.running import optimize, multi_phase
 from pdffitx.parsers import recipe_to_dict2
 
-NI_IMG = load_img(NI_IMG_FILE)
-KAPTON_IMG = load_img(KAPTON_IMG_FILE)
-NI_GR = load_array(NI_GR_FILE)
-NI_CHI = load_array(NI_CHI_FILE)
-NI_FGR = load_array(NI_FGR_FILE)
-NI_CONFIG = PDFConfig()
-NI_CONFIG.readConfig(NI_GR_FILE)
-NI_PDFGETTER = PDFGetter(NI_CONFIG)
-AI = pyFAI.load(NI_PONI_FILE)
-MASK = numpy.load(MASK_FILE)
-BLACK_IMG = load_img(BLACK_IMG_FILE)
-WHITE_IMG = load_img(WHITE_IMG_FILE)
-NI_CRYSTAL = loadCrystal(NI_CIF_FILE)
-ZRP_CRYSTAL = loadCrystal(ZRP_CIF_FILE)
-NI_DIFFPY = loadStructure(NI_CIF_FILE)
-NI_MOLECULE = Molecule(NI_CRYSTAL)
-
-DB = {
-    'Ni_img_file': NI_IMG_FILE,
-    'Ni_img': NI_IMG,
-    'Kapton_img_file': KAPTON_IMG_FILE,
-    'Kapton_img': KAPTON_IMG,
-    'Ni_poni_file': NI_PONI_FILE,
-    'Ni_gr_file': NI_GR_FILE,
-    'Ni_chi_file': NI_CHI_FILE,
-    'Ni_fgr_file': NI_FGR_FILE,
-    'ai': AI,
-    'Ni_gr': NI_GR,
-    'Ni_chi': NI_CHI,
-    'Ni_fgr': NI_FGR,
-    'black_img_file': BLACK_IMG_FILE,
-    'white_img_file': WHITE_IMG_FILE,
-    'black_img': BLACK_IMG,
-    'white_img': WHITE_IMG,
-    'Ni_config': NI_CONFIG,
-    'Ni_pdfgetter': NI_PDFGETTER,
-    'mask_file': MASK_FILE,
-    'mask': MASK,
-    'Ni_stru_file': NI_CIF_FILE,
-    'Ni_stru': NI_CRYSTAL,
-    'Ni_stru_molecule': NI_MOLECULE,
-    'Ni_stru_diffpy': NI_DIFFPY,
-    'ZrP_stru': ZRP_CRYSTAL
-}
+# the figures are never shown in the tests
+matplotlib.use("Agg")
+
+
+def _load_ai(filename: str):
+    # pyFAI is only used by the tests on the images
+    import pyFAI
+    return pyFAI.load(filename)
+
+
+def _load_config(filename: str) -> PDFConfig:
+    config = PDFConfig()
+    config.readConfig(filename)
+    return config
+
+
+class LazyDict(Mapping):
+    """A read-only dictionary. The values of the loaders are loaded at the first access and kept."""
+
+    def __init__(self, values: dict, loaders: tp.Dict[str, tp.Callable[[], tp.Any]]):
+        self._values = dict(values)
+        self._loaders = loaders
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            self._values[key] = self._loaders[key]()
+        return self._values[key]
+
+    def __iter__(self):
+        yield from self._values
+        yield from (key for key in self._loaders if key not in self._values)
+
+    def __len__(self):
+        return len(self._values.keys() | self._loaders.keys())
+
+
+# the data and the structures are only loaded by the tests that use them
+DB = LazyDict(
+    {
+        'Ni_img_file': NI_IMG_FILE,
+        'Kapton_img_file': KAPTON_IMG_FILE,
+        'Ni_poni_file': NI_PONI_FILE,
+        'Ni_gr_file': NI_GR_FILE,
+        'Ni_chi_file': NI_CHI_FILE,
+        'Ni_fgr_file': NI_FGR_FILE,
+        'black_img_file': BLACK_IMG_FILE,
+        'white_img_file': WHITE_IMG_FILE,
+        'mask_file': MASK_FILE,
+        'Ni_stru_file': NI_CIF_FILE
+    },
+    {
+        'Ni_img': functools.partial(load_img, NI_IMG_FILE),
+        'Kapton_img': functools.partial(load_img, KAPTON_IMG_FILE),
+        'ai': functools.partial(_load_ai, NI_PONI_FILE),
+        'Ni_gr': functools.partial(load_array, NI_GR_FILE),
+        'Ni_chi': functools.partial(load_array, NI_CHI_FILE),
+        'Ni_fgr': functools.partial(load_array, NI_FGR_FILE),
+        'black_img': functools.partial(load_img, BLACK_IMG_FILE),
+        'white_img': functools.partial(load_img, WHITE_IMG_FILE),
+        'Ni_config': functools.partial(_load_config, NI_GR_FILE),
+        'Ni_pdfgetter': lambda: PDFGetter(DB['Ni_config']),
+        'mask': functools.partial(numpy.load, MASK_FILE, mmap_mode="r"),
+        'Ni_stru': functools.partial(loadCrystal, NI_CIF_FILE),
+        'Ni_stru_molecule': lambda: Molecule(DB['Ni_stru']),
+        'Ni_stru_diffpy': functools.partial(loadStructure, NI_CIF_FILE),
+        'ZrP_stru': functools.partial(loadCrystal, ZRP_CIF_FILE)
+    }
+)
 
 
 @pytest.fixture(scope="session")
@@ -68,14 +99,47 @@ def db():
     return DB
 
 
+@pytest.fixture(autouse=True)
+def close_figures():
+    yield
+    plt.close("all")
+
+
+def _make_data():
+    return load_parser(NI_GR_FILE, {"qdamp": 0.04, "qbroad": 0.02})
+
+
+def _make_blank_recipe(data, structures, functions):
+    return create("test", data, (2., 7., 0.1), "f0 * G0 + A * sin(r)", functions, structures)
+
+
+def _fill_recipe(recipe):
+    initialize(recipe)
+    recipe.A.setValue(0.)
+    return recipe
+
+
 @pytest.fixture
 def data():
-    return load_parser(NI_GR_FILE, {"qdamp": 0.04, "qbroad": 0.02})
+    return _make_data()
+
+
+@pytest.fixture(scope="session")
+def parsed_ni():
+    parser = MyParser()
+    parser.parseFile(NI_GR_FILE)
+    return parser
 
 
 @pytest.fixture
-def structures():
-    return {"G0": NI_CRYSTAL}
+def ni_parser(parsed_ni):
+    # the file is parsed once and each test gets its own copy
+    return copy.deepcopy(parsed_ni)
+
+
+@pytest.fixture
+def structures(db):
+    return {"G0": db['Ni_stru']}
 
 
 @pytest.fixture
@@ -85,37 +149,49 @@ def functions():
 
 @pytest.fixture
 def blank_recipe(data, structures, functions):
-    recipe = create("test", data, (2., 7., 0.1), "f0 * G0 + A * sin(r)", functions, structures)
-    return recipe
+    return _make_blank_recipe(data, structures, functions)
 
 
 @pytest.fixture
 def filled_recipe(blank_recipe):
-    recipe = blank_recipe
-    initialize(recipe)
-    recipe.A.setValue(0.)
-    return recipe
+    return _fill_recipe(blank_recipe)
+
+
+@pytest.fixture(scope="module")
+def module_recipe(db):
+    # the same recipe as filled_recipe built once for a module, the tests must undo what they change
+    return _fill_recipe(_make_blank_recipe(_make_data(), {"G0": db['Ni_stru']}, {"f0": F.sphericalCF}))
 
 
 @pytest.fixture(scope="session")
-def optimized_recipe():
+def optimized_recipe(db):
     ni_data = load_parser(NI_GR_FILE, {"qdamp": 0.04, "qbroad": 0.02})
-    recipe = create("test", ni_data, (2., 7., 0.1), "G0", {}, {"G0": NI_CRYSTAL})
+    recipe = create("test", ni_data, (2., 7., 0.1), "G0", {}, {"G0": db['Ni_stru']})
     initialize(recipe)
     optimize(recipe, ["G0_scale"], xtol=1e-3, gtol=1e-3, ftol=1e-3)
     return recipe
 
 
-@pytest.fixture(params=[loadCrystal, loadStructure])
-def multi_recipe(request, db):
+def _make_multi_recipe(loader):
     parser = load_parser(NI_GR_FILE, {"qdamp": 0.04, "qbroad": 0.02})
-    stru = request.param(NI_CIF_FILE)
+    stru = loader(NI_CIF_FILE)
     recipe = multi_phase([(F.sphericalCF, stru)], parser, fit_range=(2., 8.0, .1), values={
         'psize_G0': 200}, sg_params={'G0': 225})
     recipe.residual()
     return recipe
 
 
+@pytest.fixture(params=[loadCrystal, loadStructure])
+def multi_recipe(request, db):
+    return _make_multi_recipe(request.param)
+
+
+@pytest.fixture(scope="module", params=[loadCrystal, loadStructure])
+def module_multi_recipe(request):
+    # the same as multi_recipe but built once for a module, the tests must not change it
+    return _make_multi_recipe(request.param)
+
+
 @pytest.fixture(scope="session")
 def doc2(optimized_recipe):
     return recipe_to_dict2(optimized_recipe)
@@ -1,6 +1,10 @@
+from types import SimpleNamespace
+
 import pytest
+from diffpy.srfit.fitbase.parameter import Parameter
 
-from pdffitx.modeling.adding import initialize
+from pdffitx.modeling.adding import initialize, add_adp
+from pdffitx.modeling.core import MyRecipe
 
 
 @pytest.mark.parametrize(
@@ -83,3 +87,15 @@ from pdffitx.modeling.adding import initialize
 def test_initialize(blank_recipe, scale, delta, lat, adp, xyz, params, expect):
     initialize(blank_recipe, scale, delta, lat, adp, xyz, params)
     assert set(blank_recipe.getNames()) == expect
+
+
+def test_add_adp_symbols():
+    # the space group ADPs that are filtered out must not shift the names of the others
+    pars = [Parameter("B12_0", 0.1), Parameter("B11_0", 0.2), Parameter("Biso_1", 0.3)]
+    atoms = [SimpleNamespace(name="Ni0"), SimpleNamespace(name="O0")]
+    phase = SimpleNamespace(sgpars=SimpleNamespace(adppars=pars), getScatterers=lambda: atoms)
+    recipe = MyRecipe()
+    add_adp(recipe, SimpleNamespace(name="G0", phase=phase), "s")
+    assert recipe.G0_Ni0_B11.par is pars[1]
+    assert recipe.G0_O0_Biso.par is pars[2]
+    assert set(recipe.getNames()) == {"G0_Ni0_B11", "G0_O0_Biso"}
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from diffpy.srfit.fitbase import Profile
+from scipy.optimize import approx_fprime
+
+from pdffitx.modeling.core import MyContribution, MyRecipe
+from pdffitx.modeling.gens import GaussianGenerator
+
+
+def make_gaussian_recipe(res_eq):
+    x = np.linspace(-5., 5., 101)
+    profile = Profile()
+    profile.setObservedProfile(x, 3. * np.exp(-0.5 * (x - 0.7) ** 2 / 1.3 ** 2), np.full_like(x, 0.1))
+    con = MyContribution("c")
+    con.setProfile(profile)
+    gen = GaussianGenerator("G")
+    con.addProfileGenerator(gen)
+    con.setEquation("G")
+    con.setResidualEquation(res_eq)
+    recipe = MyRecipe()
+    recipe.addContribution(con, 2.)
+    recipe.clearFitHooks()
+    return recipe, gen
+
+
+@pytest.mark.parametrize("res_eq", ["chiv", "resv"])
+@pytest.mark.parametrize("constrained", [False, True])
+def test_MyRecipe_jacobian(res_eq, constrained):
+    recipe, gen = make_gaussian_recipe(res_eq)
+    a = recipe.addVar(gen.A, 1.)
+    x0 = recipe.addVar(gen.x0, 0.2)
+    if constrained:
+        # the A also drives the sigma so its column is not the derivative of the generator
+        recipe.constrain(gen.sigma, a)
+    else:
+        recipe.addVar(gen.sigma, 1.1)
+    values = np.array(recipe.getValues())
+    expected = approx_fprime(values, recipe.residual, 1e-7)
+    assert np.allclose(recipe.jacobian(values), expected, rtol=1e-4, atol=1e-4)
+    columns = recipe._analytic_columns([a, x0])
+    assert (a in columns) is not constrained
+    assert x0 in columns
+
+
+def test_MyRecipe_jacobian_reuse(monkeypatch):
+    recipe, gen = make_gaussian_recipe("chiv")
+    recipe.addVar(gen.A, 1.)
+    recipe.addVar(gen.x0, 0.2)
+    values = np.array(recipe.getValues())
+    expected = recipe.jacobian(values)
+    recipe.residual(values)
+    calls = []
+    residual = recipe.residual
+
+    def counted(*args, **kwargs):
+        calls.append(args)
+        return residual(*args, **kwargs)
+
+    monkeypatch.setattr(recipe, "residual", counted)
+    # all the columns are analytic and the residual at the values is the last one
+    assert np.allclose(recipe.jacobian(values), expected)
+    assert not calls
+    # the residual is evaluated again after the recipe changes
+    gen.sigma.setValue(1.1)
+    recipe.jacobian(values)
+    assert len(calls) == 1
+    recipe.jacobian(values * 1.1)
+    assert len(calls) == 2
+
+
+def test_MyRecipe_getResults():
+    recipe, gen = make_gaussian_recipe("chiv")
+    recipe.addVar(gen.A, 1.)
+    recipe.addVar(gen.x0, 0.2)
+    res = recipe.getResults()
+    assert recipe.getResults() is res
+    changes = [
+        lambda: gen.sigma.setValue(1.1),
+        lambda: recipe.setWeight(recipe.c, 1.),
+        lambda: recipe.fix("A"),
+        lambda: recipe.c.profile.setCalculationRange(-4., 4.),
+        lambda: recipe.constrain(gen.sigma, "x0 + 1."),
+    ]
+    for change in changes:
+        change()
+        new = recipe.getResults()
+        assert new is not res
+        assert recipe.getResults() is new
+        res = new
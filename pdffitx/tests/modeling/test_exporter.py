@@ -1,11 +1,21 @@
+from pathlib import Path
 from tempfile import TemporaryDirectory
 
 import pytest
+from pyobjcryst.crystal import Crystal
 
 import pdffitx.modeling.exporter as exporter
 from pdffitx.modeling.exporter import save
 
 
+@pytest.fixture
+def folder():
+    # the files are written to the memory if the system has a tmpfs
+    shm = Path("/dev/shm")
+    with TemporaryDirectory(dir=shm if shm.is_dir() else None) as temp_dir:
+        yield temp_dir
+
+
 @pytest.mark.parametrize(
     "kwargs",
     [
@@ -13,14 +23,14 @@ from pdffitx.modeling.exporter import save
         {"stru_fmt": "xyz"}
     ]
 )
-def test_save(multi_recipe, kwargs):
-    with TemporaryDirectory() as temp_dir:
-        res_file, fgr_files, stru_files = save(multi_recipe, base_name="test", folder=temp_dir, **kwargs)
-        assert res_file.is_file()
-        assert len(fgr_files) == 1 and fgr_files[0].is_file()
-        assert len(stru_files) == 1 and stru_files[0].is_file()
+def test_save(module_multi_recipe, folder, kwargs):
+    res_file, fgr_files, stru_files = save(module_multi_recipe, base_name="test", folder=folder, **kwargs)
+    assert res_file.is_file()
+    assert len(fgr_files) == 1 and fgr_files[0].is_file()
+    assert len(stru_files) == 1 and stru_files[0].is_file()
 
 
-def test_write_crystal_error(db):
+def test_write_crystal_error():
+    # the format is checked before the structure is used
     with pytest.raises(ValueError):
-        exporter.write_crystal(db['Ni_stru'], 'error.mol', fmt='mol')
+        exporter.write_crystal(Crystal(), 'error.mol', fmt='mol')
@@ -1,8 +1,11 @@
+import numpy as np
 import pytest
+from diffpy.srfit.structure.diffpyparset import DiffpyStructureParSet
+from diffpy.structure import Atom, Lattice, Structure
 
 from pdffitx.modeling import F
-from pdffitx.modeling.fitfuncs import make_generator, get_sgpars, make_contribution, plot
-from pdffitx.modeling.fitobjs import GenConfig, ConConfig, MyParser, FunConfig
+from pdffitx.modeling.fitfuncs import make_generator, get_sgpars, make_contribution, plot, fit, _choose_method
+from pdffitx.modeling.fitobjs import GenConfig, ConConfig, FunConfig
 from pdffitx.modeling.gens import GaussianGenerator
 
 
@@ -17,6 +20,13 @@ def test_make_generator(db, kwargs):
     make_generator(gen_config)
 
 
+def test_make_generator_threads(db):
+    r = np.arange(2., 7., .1)
+    serial = make_generator(GenConfig("G0", db['Ni_stru']))
+    threaded = make_generator(GenConfig("G0", db['Ni_stru'], ncpu=2, threads=True))
+    assert np.allclose(threaded(r), serial(r))
+
+
 @pytest.mark.parametrize(
     "arg", ["P1"]
 )
@@ -26,19 +36,37 @@ def test_get_sgpars(multi_recipe, arg):
     get_sgpars(gen.phase, arg)
 
 
+def test_get_sgpars_cache():
+    lattice = Lattice(3.5, 3.5, 3.5, 90, 90, 90)
+    stru = Structure([Atom("Ni", [0., 0., 0.]), Atom("Ni", [.5, .5, 0.])], lattice=lattice)
+    parset = DiffpyStructureParSet("G0", stru)
+    sgpars = get_sgpars(parset, "P1")
+    assert get_sgpars(parset, "P1") is sgpars
+    # the cache is invalidated by the atoms, the coordinates and the lattice
+    changes = [
+        lambda: parset.atoms.pop(),
+        lambda: parset.atoms[0].x.setValue(.1),
+        lambda: parset.getLattice().a.setValue(3.6)
+    ]
+    for change in changes:
+        change()
+        new = get_sgpars(parset, "P1")
+        assert new is not sgpars
+        assert get_sgpars(parset, "P1") is new
+        sgpars = new
+
+
 def test_get_sgpars_error(db):
     with pytest.raises(ValueError):
         get_sgpars(db['Ni_stru'])
 
 
-def test_make_contribution(db):
-    parser = MyParser()
-    parser.parseFile(db['Ni_gr_file'])
+def test_make_contribution(db, ni_parser):
     gen_config = GenConfig("G", db['Ni_stru'])
     fun_config = FunConfig("f", F.sphericalCF)
     con_config = ConConfig(
         name="test",
-        parser=parser,
+        parser=ni_parser,
         fit_range=(0, 8, 0.01),
         eq="G + B",
         funconfigs=[fun_config],
@@ -52,3 +80,42 @@ def test_make_contribution(db):
 def test_plot(filled_recipe):
     filled_recipe.residual()
     plot(next(iter(filled_recipe.contributions.values())))
+
+
+def test_plot_reuse(filled_recipe, optimized_recipe):
+    # the two contributions share the name "test" but not the figure
+    con_a = next(iter(filled_recipe.contributions.values()))
+    con_b = next(iter(optimized_recipe.contributions.values()))
+    filled_recipe.residual()
+    ax_a = plot(con_a)
+    assert plot(con_b) is not ax_a
+    assert plot(con_a) is ax_a
+
+
+@pytest.mark.parametrize(
+    "lb, loss, verbose, expected",
+    [
+        (-np.inf, "linear", 0, "lm"),
+        (0., "linear", 0, "trf"),
+        (-np.inf, "soft_l1", 0, "trf"),
+        (-np.inf, "linear", 2, "trf")
+    ]
+)
+def test_choose_method(filled_recipe, lb, loss, verbose, expected):
+    n = len(filled_recipe.getNames())
+    bounds = (np.full(n, lb), np.full(n, np.inf))
+    assert _choose_method(filled_recipe, bounds, loss, verbose) == expected
+
+
+def test_fit_lm(filled_recipe):
+    n = len(filled_recipe.getNames())
+    bounds = (np.full(n, -np.inf), np.full(n, np.inf))
+    fit(filled_recipe, method=None, bounds=bounds, verbose=0, max_nfev=5)
+
+
+def test_choose_method_few_points(filled_recipe):
+    # lm can't solve a problem with fewer residuals than variables
+    filled_recipe.test.profile.setCalculationRange(2., 2.2, .1)
+    n = len(filled_recipe.getNames())
+    bounds = (np.full(n, -np.inf), np.full(n, np.inf))
+    assert _choose_method(filled_recipe, bounds, "linear", 0) == "trf"
@@ -2,8 +2,8 @@ import numpy as np
 import pytest
 
 import pdffitx.modeling.fitobjs as fitobjs
+from pdffitx.modeling.fitfuncs import make_generator, make_profile
 from pdffitx.modeling.fitobjs import MyParser, GenConfig, ConConfig
-from pdffitx.modeling.running import multi_phase
 
 
 @pytest.mark.parametrize(
@@ -16,9 +16,9 @@ from pdffitx.modeling.running import multi_phase
 def test_MyParser_parseDict(db, meta):
     parser = MyParser()
     parser.parseDict(db['Ni_gr'], meta=meta)
-    recipe = multi_phase([db['Ni_stru']], parser, fit_range=(0., 8., .1))
-    con = next(iter(recipe.contributions.values()))
-    gen = next(iter(con.generators.values()))
+    # the meta data reaches the generator through the profile
+    gen = make_generator(GenConfig("G0", db['Ni_stru']))
+    gen.setProfile(make_profile(parser, (0., 8., .1)))
     # if meta = None, generator will use the default values
     assert gen.getQmin() == parser._meta.get('qmin', 0.0)
     assert gen.getQmax() == parser._meta.get('qmax', 100. * np.pi)
@@ -30,7 +30,8 @@ def test_MyParser_parseDict(db, meta):
     "data",
     [
         np.zeros((1, 5)),
-        np.zeros((5, 5))
+        np.zeros((5, 5)),
+        np.zeros(5)
     ]
 )
 def test_MyParser_parseDict_error(data):
@@ -111,13 +112,11 @@ def test_GenConfig(db, stru_key, expect):
         ({'res_eq': 'chiv'}, {'res_eq': 'chiv'})
     ]
 )
-def test_ConConfig(db, kwargs, expect):
-    parser = MyParser()
-    parser.parseFile(db['Ni_gr_file'])
+def test_ConConfig(db, ni_parser, kwargs, expect):
     stru = db['Ni_stru']
     con_config = ConConfig(
         name="con",
-        parser=parser,
+        parser=ni_parser,
         fit_range=(0., 8., .1),
         genconfigs=[GenConfig('G0', stru)],
         eq="G0",
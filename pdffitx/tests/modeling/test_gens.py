@@ -8,3 +8,23 @@ def test_GaussianGenerator():
     for a in ('A', 'x0', 'sigma'):
         assert hasattr(gen, a)
     assert np.array_equal(np.ones(3), gen(np.zeros(3)))
+
+
+def test_GaussianGenerator_no_aliasing():
+    gen = GaussianGenerator("Gaussian")
+    x = np.zeros(3)
+    y1 = gen(x)
+    gen.A.setValue(2.)
+    y2 = gen(x)
+    assert y1 is not y2
+    assert np.array_equal(np.ones(3), y1)
+    assert np.array_equal(np.full(3, 2.), y2)
+
+
+def test_GaussianGenerator_derivatives():
+    gen = GaussianGenerator("Gaussian")
+    x = np.linspace(-1., 1., 5)
+    dct = gen.derivatives(x)
+    assert np.allclose(dct[gen.A], gen(x))
+    assert np.allclose(dct[gen.x0], x * gen(x))
+    assert np.allclose(dct[gen.sigma], x ** 2 * gen(x))
@@ -1,7 +1,11 @@
 import pytest
-from matplotlib import pyplot as plt
 
-from pdffitx.modeling import F, multi_phase, optimize, fit_calib, MyParser
+from pdffitx.modeling import F, multi_phase, optimize, fit_calib
+
+# the variables of the ZrP structure without and with the free atom positions
+_ZRP_NAMES = {'Biso_O_G0', 'Biso_P_G0', 'Biso_Zr_G0', 'a_G0', 'b_G0', 'beta_G0', 'c_G0', 'delta2_G0', 'psize_f0',
+              'scale_G0'}
+_ZRP_XYZ = {f"{c}_{i}_G0" for c in "xyz" for i in range(10)}
 
 
 @pytest.mark.parametrize(
@@ -37,8 +41,7 @@ from pdffitx.modeling import F, multi_phase, optimize, fit_calib, MyParser
             dict(),
             False,
             True,
-            {'Biso_O_G0', 'Biso_P_G0', 'Biso_Zr_G0', 'a_G0', 'b_G0', 'beta_G0', 'c_G0',
-             'delta2_G0', 'psize_f0', 'scale_G0'}
+            _ZRP_NAMES
         ),
         (
             "ZrP_stru",
@@ -47,11 +50,7 @@ from pdffitx.modeling import F, multi_phase, optimize, fit_calib, MyParser
             },
             True,
             True,
-            {'Biso_O_G0', 'Biso_P_G0', 'Biso_Zr_G0', 'a_G0', 'b_G0', 'beta_G0', 'c_G0', 'delta2_G0',
-             'psize_f0', 'scale_G0', 'x_0_G0', 'x_1_G0', 'x_2_G0', 'x_3_G0', 'x_4_G0', 'x_5_G0', 'x_6_G0',
-             'x_7_G0', 'x_8_G0', 'x_9_G0', 'y_0_G0', 'y_1_G0', 'y_2_G0', 'y_3_G0', 'y_4_G0',
-             'y_5_G0', 'y_6_G0', 'y_7_G0', 'y_8_G0', 'y_9_G0', 'z_0_G0', 'z_1_G0', 'z_2_G0',
-             'z_3_G0', 'z_4_G0', 'z_5_G0', 'z_6_G0', 'z_7_G0', 'z_8_G0', 'z_9_G0'}
+            _ZRP_NAMES | _ZRP_XYZ
         ),
         (
             "Ni_stru",
@@ -98,12 +97,10 @@ from pdffitx.modeling import F, multi_phase, optimize, fit_calib, MyParser
         )
     ]
 )
-def test_multi_phase(db, data_key, kwargs, free_params, use_cf, expected):
-    parser = MyParser()
-    parser.parseFile(db['Ni_gr_file'])
+def test_multi_phase(db, ni_parser, data_key, kwargs, free_params, use_cf, expected):
     phase = (F.sphericalCF, db[data_key]) if use_cf else db[data_key]
     recipe = multi_phase(
-        [phase], parser,
+        [phase], ni_parser,
         fit_range=(2., 8.0, .1),
         **kwargs
     )
@@ -117,31 +114,33 @@ def test_multi_phase(db, data_key, kwargs, free_params, use_cf, expected):
     values = kwargs.get('values')
     if values:
         actual_values = dict(zip(recipe.getNames(), recipe.getValues()))
-        for name, expected_value in values.items():
-            assert actual_values[name] == expected_value
+        assert {name: actual_values[name] for name in values} == values
     # check bounds
     bounds = kwargs.get('bounds')
     if bounds:
         actual_bounds = dict(zip(recipe.getNames(), recipe.getBounds()))
-        for name, expected_bound in bounds.items():
-            assert actual_bounds[name] == expected_bound
+        assert {name: actual_bounds[name] for name in bounds} == bounds
 
 
 @pytest.mark.parametrize(
     "kwargs",
     [
-        dict(tags=['G0_scale'], xtol=1e-2, gtol=1e-2, ftol=1e-2),
-        dict(tags=[('G0_scale', 'G0_lat'), 'G0_adp'], xtol=1e-2, gtol=1e-2, ftol=1e-2),
-        dict(tags=['G0_scale'], verbose=1, xtol=1e-2, gtol=1e-2, ftol=1e-2),
-        dict(tags=[('G0_scale', 'G0_lat'), 'G0_adp'], verbose=1, xtol=1e-2, gtol=1e-2, ftol=1e-2)
+        dict(tags=['G0_scale'], xtol=1e-2, gtol=1e-2, ftol=1e-2, max_nfev=5),
+        dict(tags=[('G0_scale', 'G0_lat'), 'G0_adp'], xtol=1e-2, gtol=1e-2, ftol=1e-2, max_nfev=5),
+        dict(tags=['G0_scale'], verbose=1, xtol=1e-2, gtol=1e-2, ftol=1e-2, max_nfev=5),
+        dict(tags=[('G0_scale', 'G0_lat'), 'G0_adp'], verbose=1, xtol=1e-2, gtol=1e-2, ftol=1e-2, max_nfev=5)
     ]
 )
 def test_optimize(filled_recipe, kwargs):
     optimize(filled_recipe, **kwargs)
 
 
-def test_fit_calib(db):
-    parser = MyParser()
-    parser.parseFile(db['Ni_gr_file'])
-    fit_calib(db['Ni_stru'], parser, fit_range=(2., 8., .1))
-    plt.clf()
+def test_fit_calib(db, ni_parser):
+    fit_calib(db['Ni_stru'], ni_parser, fit_range=(2., 8., .1))
+
+
+def test_getResults(filled_recipe):
+    res = filled_recipe.getResults()
+    assert filled_recipe.getResults() is res
+    filled_recipe.fix("all")
+    assert filled_recipe.getResults() is not res
@@ -5,6 +5,17 @@ from pdffitx.modeling.setting import set_range, get_range, set_values, get_value
     bound_windows, get_bounds
 
 
+@pytest.fixture
+def filled_recipe(module_recipe):
+    # the recipe is built once and the values and bounds of the variables are restored after each test
+    pars = list(module_recipe._parameters.values())
+    saved = [(par.value, list(par.bounds)) for par in pars]
+    yield module_recipe
+    for par, (value, bounds) in zip(pars, saved):
+        par.setValue(value)
+        par.bounds = bounds
+
+
 @pytest.mark.parametrize(
     "rmin, rmax, rstep, expect",
     [
@@ -83,3 +94,12 @@ def test_bound_windows(filled_recipe, bounds, ignore, ratio, expect):
     bound_windows(filled_recipe, bounds, ignore=ignore, ratio=ratio)
     real = get_bounds(filled_recipe, bounds.keys())
     assert real == expect
+
+
+def test_bound_ranges_not_mutate(filled_recipe):
+    filled_recipe.G0_scale.setValue(0.5)
+    bounds = {"G0_scale": {"lb": 0.2, "ub": 1.}}
+    bound_ranges(filled_recipe, bounds, ratio=True)
+    bound_ranges(filled_recipe, bounds, ratio=True)
+    assert bounds == {"G0_scale": {"lb": 0.2, "ub": 1.}}
+    assert get_bounds(filled_recipe, bounds.keys()) == [[0.1, 0.5]]
@@ -46,6 +46,19 @@ def test_dict_to_array(dct, keys, expected):
                     [[0, 1], [2, 1], [1, 2]]
                 ]
             )
+        ),
+        (
+            [
+                {"result": {"x": [0, 1], "ycalc": [2, 1], "y": [1, 2]}},
+                {"result": {"x": [0, 1], "ycalc": [1.5, 2], "y": [2, 1]}}
+            ],
+            ("result",),
+            np.array(
+                [
+                    [[0, 1], [1, 2], [2, 1]],
+                    [[0, 1], [2, 1], [1.5, 2]]
+                ]
+            )
         )
     ]
 )
@@ -54,3 +67,9 @@ def test_dicts_to_array(dcts, keys, expected):
         dicts_to_array(dcts, keys),
         expected
     )
+
+
+def test_dicts_to_array_error():
+    dcts = [{"x": [0, 1], "y": [1, 2], "ycalc": [1, 1]}, {"x": [0, 1, 2], "y": [1, 2, 1], "ycalc": [1, 1, 1]}]
+    with pytest.raises(ValueError):
+        dicts_to_array(dcts, tuple())
@@ -1,27 +1,36 @@
-import pprint
-
 import mongomock
+import numpy as np
+import pytest
 from mongomock.collection import Collection
 
 from pdffitx.parsers.atoms import dict_to_atoms, dict_to_atoms2
-from pdffitx.parsers.fitrecipe import recipe_to_dict, recipe_to_dict2
+from pdffitx.parsers.fitdata import dict_to_array
+from pdffitx.parsers.fitrecipe import recipe_to_dict
 
 
-def test_recipe_to_dict(optimized_recipe):
+@pytest.fixture(scope="module")
+def collection() -> Collection:
     client = mongomock.MongoClient()
-    collection: Collection = client.db.collection
+    return client.db.collection
+
+
+def test_recipe_to_dict(optimized_recipe, collection):
     dct = recipe_to_dict(optimized_recipe)
-    pprint.pprint(dct)
     # test db friendly
-    collection.insert_one(dct)
-    dict_to_atoms(collection.find_one())
+    doc_id = collection.insert_one(dct).inserted_id
+    dict_to_atoms(collection.find_one({"_id": doc_id}))
 
 
-def test_recipe_to_dict2(optimized_recipe):
-    client = mongomock.MongoClient()
-    collection: Collection = client.db.collection
-    dct = recipe_to_dict2(optimized_recipe)
-    pprint.pprint(dct)
-    collection.insert_one(dct)
-    dict_to_atoms2(collection.find_one())
-    assert 'eq' in list(dct['conresults'][0].keys())
+def test_recipe_to_dict2(doc2, collection):
+    # insert a copy because the insertion adds the "_id" to the shared document
+    doc_id = collection.insert_one(dict(doc2)).inserted_id
+    dict_to_atoms2(collection.find_one({"_id": doc_id}))
+    assert 'eq' in list(doc2['conresults'][0].keys())
+
+
+def test_recipe_to_dict_no_list(optimized_recipe):
+    dct = recipe_to_dict(optimized_recipe, to_list=False)
+    assert isinstance(dct['cov'], np.ndarray)
+    conresult = dct['conresults'][0]
+    assert isinstance(conresult['ycalc'], np.ndarray)
+    assert dict_to_array(dct, ('conresults', 0)).shape == (3, conresult['x'].shape[0])
@@ -12,3 +12,16 @@ import pdffitx.parsers.tools as tools
 )
 def test_get_value(dct, keys, expect):
     assert tools.get_value(dct, keys) == expect
+
+
+@pytest.mark.parametrize(
+    "s,letter,digit",
+    [
+        ("Ni0", "Ni", "0"),
+        ("O12_b", "Ob", "12"),
+        ("", "", "")
+    ]
+)
+def test_only_letter_digit(s, letter, digit):
+    assert tools.only_letter(s) == letter
+    assert tools.only_digit(s) == digit
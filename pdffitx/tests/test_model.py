@@ -5,13 +5,12 @@ import matplotlib.pyplot as plt
 import pytest
 import xarray as xr
 import numpy as np
+from diffpy.structure import loadStructure
 
 import pdffitx.files as files
 import pdffitx.io as io
 import pdffitx.model as mod
 
-plt.ioff()
-
 
 def test_MultiPhaseModel_1(tmpdir):
     # create a model
@@ -86,21 +85,15 @@ def test_MultiPhaseModel_1(tmpdir):
 
     # plot the fits
     model.plot()
-    plt.show(block=False)
-    plt.clf()
 
     # plot the exported fits
     ds = model.export_fits()
     fig, ax = plt.subplots()
     mod.plot_fits(ds, ax=ax)
-    plt.show(block=False)
-    plt.clf()
 
     # plot the stacked fits
     ds2 = xr.concat([ds, ds], dim="dim_0")
     mod.plot_fits_along_dim(ds2, "dim_0")
-    plt.show(block=False)
-    plt.clf()
 
 
 def test_MultiPhaseModel_2(tmpdir):
@@ -120,6 +113,24 @@ def test_MultiPhaseModel_3():
     x = np.arange(0, 5, 0.1)
     arr = model.calc_phase(x, "G")
     assert isinstance(arr, xr.DataArray)
+    # the second call gives the same result
+    xr.testing.assert_identical(model.calc_phase(x, "G"), arr)
+
+
+def test_MultiPhaseModel_3_new_structure():
+    """Test that the calc_phase method uses the replaced structure"""
+    Ni = loadStructure(files.NI_CIF_FILE)
+    model = mod.MultiPhaseModel("G", {"G": Ni})
+    x = np.arange(1, 5, 0.1)
+    arr = model.calc_phase(x, "G")
+    # the same parameters but another element
+    Cu = loadStructure(files.NI_CIF_FILE)
+    for atom in Cu:
+        atom.element = "Cu"
+    gen = model.get_generators()["G"]
+    gen.removeParameterSet(gen.phase)
+    gen.setStructure(Cu, periodic=True)
+    assert not np.allclose(model.calc_phase(x, "G"), arr)
 
 
 def test_MultiPhaseModel_4():
@@ -1,12 +1,18 @@
 """Used in release procedure."""
+import functools
+import hashlib
 import shutil
-import subprocess
 import sys
+from importlib import metadata
 from pathlib import Path
 
-import pkg_resources
 import yaml
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 # package info
 NAME = 'pdffitx'
 DESCRIPTION = "A python package to model atomic pair distribution function (PDF) based on diffpy-cmi."
@@ -31,11 +37,11 @@ def conda_recipe() -> None:
     # create conda_build_config.yaml
     conda_build_config_yaml = recipe_dir / "conda_build_config.yaml"
     with conda_build_config_yaml.open("w") as f:
-        yaml.safe_dump(conda_build_config(), f, sort_keys=False)
+        yaml.dump(conda_build_config(), f, Dumper=SafeDumper, sort_keys=False)
     # create meta.yaml
     meta_yaml = recipe_dir / "meta.yaml"
     with meta_yaml.open("w") as f:
-        yaml.safe_dump(conda_meta(), f, sort_keys=False)
+        yaml.dump(conda_meta(), f, Dumper=SafeDumper, sort_keys=False)
     # copy license
     shutil.copy(LICENSE_FILE, recipe_dir / LICENSE_FILE.name)
     return
@@ -51,12 +57,12 @@ def conda_build_config() -> dict:
 
 def conda_meta() -> dict:
     """Make the dictionary of conda meta information."""
-    package = pkg_resources.require(NAME)[0]
-    name = package.project_name
-    version = package.version
+    package = metadata.metadata(NAME)
+    name = package["Name"]
+    version = package["Version"]
     git_account = GIT_ACCOUNT
-    build = read_dependencies(REQUIREMENTS / "build.txt")
-    run = read_dependencies(REQUIREMENTS / "run.txt")
+    build = list(read_dependencies(REQUIREMENTS / "build.txt"))
+    run = list(read_dependencies(REQUIREMENTS / "run.txt"))
     tar_file_name = rf"{name}-{version}.tar.gz"
     sha256 = get_hash(REVER_DIR / tar_file_name)
     return {
@@ -91,25 +97,25 @@ def conda_meta() -> dict:
 
 
 def get_hash(file_path: Path, hash_type: str = "sha256") -> str:
-    """Use openssl to get the hash of a file."""
-    cp = subprocess.run(
-        ["openssl", "dgst", rf"-{hash_type}", str(file_path)],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-    if cp.returncode != 0:
-        sys.exit(cp.stderr)
-    return cp.stdout.decode('utf-8').split("= ")[1].strip('\n')
+    """Use hashlib to get the hash of a file."""
+    try:
+        h = hashlib.new(hash_type)
+        with file_path.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    except (OSError, ValueError) as error:
+        sys.exit(str(error))
+    return h.hexdigest()
 
 
-def read_dependencies(txt_file: Path) -> list:
+@functools.lru_cache(maxsize=None)
+def read_dependencies(txt_file: Path) -> tuple:
     """Read name of the required packages."""
     with txt_file.open("r") as f:
-        dependencies = [
+        dependencies = tuple(
             line for line in f.read().splitlines()
             if not line.startswith('#')
-        ]
+        )
     return dependencies
 
 